@@ -1,32 +1,60 @@
-"""The CustomIntegration integration."""
+"""The CustomIntegration integration.
 
-import asyncio
-from datetime import timedelta
-import logging
-
-import voluptuous as vol
+Kept free of Home Assistant and pymodbus imports at module level, so the
+package can be imported without them. What a config entry needs is imported
+when the first entry is set up.
+"""
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from __future__ import annotations
 
-from .const import DOMAIN
-from .modbus_poll import CopmaxModbusPoll
+from importlib import import_module
+import logging
+from typing import TYPE_CHECKING
+
+from .const import (
+    CONF_BAUDRATE,
+    CONF_CAPABILITIES,
+    CONF_DISCOVERY,
+    CONF_FLOW_RATE,
+    CONF_POWER_ENTITY,
+    CONF_PROXY_HOST,
+    CONF_PROXY_PORT,
+    CONF_REGISTER_LOG_SIZE,
+    CONF_TRANSPORT,
+    DATA_SCHEDULER,
+    DEFAULT_BAUDRATE,
+    DEFAULT_FLOW_RATE,
+    DEFAULT_PROXY_HOST,
+    DEFAULT_PROXY_PORT,
+    DEFAULT_REGISTER_LOG_SIZE,
+    DOMAIN,
+    TRANSPORT_TCP,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import CopmaxCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-CONFIG_SCHEMA = vol.Schema({DOMAIN: vol.Schema({})}, extra=vol.ALLOW_EXTRA)
-
-PLATFORMS = ["number", "sensor", "switch"]
+PLATFORMS = ["climate", "number", "sensor", "switch", "water_heater"]
 # PLATFORMS = ["number"]
 # PLATFORMS = ["sensor"]
 
 
-async def async_setup(hass: HomeAssistant, config: dict):
-    """Set up the CustomIntegration component."""
+def _import_coordinator(transport: str):
+    """Import the coordinator and the pymodbus client of the transport.
 
-    hass.data[DOMAIN] = {}
-    return True
+    Runs in the executor, so the imports do not block the event loop.
+    """
+    from .transport import client_class
+
+    client_class(transport)
+    import_module(f"{__name__}.services")
+    import_module(f"{__name__}.websocket_api")
+    return import_module(f"{__name__}.coordinator")
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
@@ -35,34 +63,120 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     device_port = entry.data["inverter_port"]
     device_scaninterval = entry.data["scan_interval"]
     device_alias = entry.data["alias"]
+    transport = entry.data.get(CONF_TRANSPORT, TRANSPORT_TCP)
+    flow_rate, power_entity = _derived_options(entry)
+
+    module = await hass.async_add_import_executor_job(_import_coordinator, transport)
 
-    copmaxPoll = CopmaxModbusPoll(device_hostname, device_port)
+    copmaxPoll = module.CopmaxModbusPoll(
+        device_hostname,
+        device_port,
+        transport,
+        entry.data.get(CONF_BAUDRATE, DEFAULT_BAUDRATE),
+    )
 
     # Fetch initial data so we have data when entities subscribe
-    coordinator = CopmaxCoordinator(hass, copmaxPoll, device_alias, device_scaninterval)
+    coordinator = module.CopmaxCoordinator(
+        hass, copmaxPoll, device_alias, device_scaninterval
+    )
+    if flow_rate:
+        coordinator.derived = module.CopmaxDerivedValues(flow_rate)
+        coordinator.power_entity = power_entity
+    coordinator.apply_options(entry.options)
+
+    # One scheduler for all entries, so the heat pumps are not polled at once
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_SCHEDULER not in domain_data:
+        domain_data[DATA_SCHEDULER] = module.CopmaxScheduler(hass.loop)
+    coordinator.scheduler = domain_data[DATA_SCHEDULER]
+    entry.async_on_unload(coordinator.scheduler.add(coordinator, device_hostname))
+
+    # Probed once, entries created before the probe existed are probed now
+    if CONF_CAPABILITIES in entry.data:
+        copmaxPoll.apply_capabilities(entry.data[CONF_CAPABILITIES])
+    else:
+        try:
+            await coordinator.async_probe_capabilities()
+        except ConnectionError as ex:
+            _LOGGER.warning(f"Capabilities of '{device_alias}' not probed: {ex!s}")
+
     await coordinator.async_config_entry_first_refresh()
 
-    hass.data[DOMAIN][entry.entry_id] = HassCustomIntegration(
+    # Only once the heat pump answered, a retried setup would leave them open
+    await coordinator.async_set_discovery(entry.options.get(CONF_DISCOVERY, False))
+    await coordinator.async_set_register_log(
+        entry.options.get(CONF_REGISTER_LOG_SIZE, DEFAULT_REGISTER_LOG_SIZE)
+    )
+
+    domain_data[entry.entry_id] = HassCustomIntegration(
         coordinator, device_hostname, device_port
     )
+    domain_data[entry.entry_id].derived_options = (flow_rate, power_entity)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     await coordinator.async_refresh()
 
+    await coordinator.async_set_proxy(
+        entry.options.get(CONF_PROXY_PORT, DEFAULT_PROXY_PORT),
+        entry.options.get(CONF_PROXY_HOST, DEFAULT_PROXY_HOST),
+    )
+    await coordinator.async_load_schedule()
+
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    # Already imported in the executor
+    from .services import async_setup_services
+    from .websocket_api import async_setup_websocket_api
+
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+
     return True
 
 
+def _derived_options(entry: ConfigEntry) -> tuple[float, str | None]:
+    """Flow rate and power sensor, from the options once changed there."""
+    settings = entry.data | entry.options
+    return (
+        settings.get(CONF_FLOW_RATE, DEFAULT_FLOW_RATE),
+        settings.get(CONF_POWER_ENTITY) or None,
+    )
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry):
+    """Apply changed options to the running coordinator, without a reload.
+
+    Only a changed flow rate or power sensor reloads the entry, they decide
+    which sensors exist.
+    """
+    copmax = hass.data[DOMAIN][entry.entry_id]
+    if _derived_options(entry) != copmax.derived_options:
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        return
+    await copmax._coordinator.async_apply_options(entry.options)
+    await copmax._coordinator.async_set_discovery(
+        entry.options.get(CONF_DISCOVERY, False)
+    )
+    await copmax._coordinator.async_set_proxy(
+        entry.options.get(CONF_PROXY_PORT, DEFAULT_PROXY_PORT),
+        entry.options.get(CONF_PROXY_HOST, DEFAULT_PROXY_HOST),
+    )
+    await copmax._coordinator.async_set_register_log(
+        entry.options.get(CONF_REGISTER_LOG_SIZE, DEFAULT_REGISTER_LOG_SIZE)
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
-    unload_ok = all(
-        await asyncio.gather(
-            *[
-                hass.config_entries.async_forward_entry_unload(entry, component)
-                for component in PLATFORMS
-            ]
-        )
-    )
+    # While the coordinator is still with the scheduler
+    coordinator = hass.data[DOMAIN][entry.entry_id]._coordinator
+    await coordinator.async_stop_capture()
+    await coordinator.async_set_proxy(0)
+    await coordinator.async_set_register_log(0)
+    coordinator.stop_schedule()
+
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
 
@@ -71,7 +185,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
 
 class HassCustomIntegration:
     def __init__(
-        self, coordinator: DataUpdateCoordinator, inverter_host: str, inverter_port: int
+        self, coordinator: CopmaxCoordinator, inverter_host: str, inverter_port: int
     ):
         self._inverter_host = inverter_host
         self._inverter_port = inverter_port
@@ -80,39 +194,11 @@ class HassCustomIntegration:
         # create an instance of StecaConnector
         self._coordinator = coordinator
 
+        # Flow rate and power sensor the entry was set up with
+        self.derived_options: tuple = ()
+
     def get_name(self):
         return f"copmax_{self._inverter_host}_{str(self._inverter_port)}"
 
     def get_unique_id(self):
         return f"copmax_{self._inverter_host}_{str(self._inverter_port)}"
-
-
-class CopmaxCoordinator(DataUpdateCoordinator):
-    """CustomIntegration coordinator."""
-
-    def __init__(
-        self, hass, copmaxPoll: CopmaxModbusPoll, alias: str, pollinterval: int
-    ):
-        """Initialize my coordinator."""
-        super().__init__(
-            hass,
-            _LOGGER,
-            # Name of the data. For logging purposes.
-            name=f"CustomIntegration coordinator for '{alias}'",
-            # Polling interval. Will only be polled if there are subscribers.
-            update_interval=timedelta(seconds=15),
-        )
-        self.copmaxModbusPoll = copmaxPoll
-        self.alias = alias
-
-    async def _async_update_data(self):
-        # Fetch data from API endpoint. This is the place to pre-process the data to lookup tables so entities can quickly look up their data.
-
-        try:
-            retval = await self.copmaxModbusPoll.poll_heat_pump_data()
-            return retval
-
-        except Exception as e:
-            _LOGGER.error(
-                f"CustomIntegrationCoordinator _async_update_data failed: {e}"
-            )
@@ -0,0 +1,84 @@
+"""Circuit breaker that stops polling a heat pump that is not answering."""
+
+import time
+
+from .const import BREAKER_BASE_BACKOFF, BREAKER_MAX_BACKOFF, BREAKER_THRESHOLD
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The heat pump is considered offline, no request was sent."""
+
+
+class CircuitBreaker:
+    """Closed while polls succeed, open with exponential backoff when they fail.
+
+    After the backoff a single cheap probe is let through (half open). If it
+    answers the breaker closes again, otherwise it reopens with twice the
+    backoff, up to BREAKER_MAX_BACKOFF.
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        base_backoff: float = BREAKER_BASE_BACKOFF,
+        max_backoff: float = BREAKER_MAX_BACKOFF,
+    ):
+        self.threshold = threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.backoff = base_backoff
+        self.opened_at = None
+        self.retry_at = None
+
+        # Statistics
+        self.trips = 0
+        self.recoveries = 0
+        self.last_outage = None  # seconds from opening to recovery
+
+    def allow_request(self) -> bool:
+        """Check if a poll may go out, moving from open to half open when due."""
+        if self.state == STATE_OPEN and time.time() >= self.retry_at:
+            self.state = STATE_HALF_OPEN
+        return self.state != STATE_OPEN
+
+    def record_success(self):
+        if self.state != STATE_CLOSED:
+            self.last_outage = time.time() - self.opened_at
+            self.recoveries += 1
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.backoff = self.base_backoff
+        self.opened_at = None
+        self.retry_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == STATE_HALF_OPEN:
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            self._open()
+        elif self.state == STATE_CLOSED and self.consecutive_failures >= self.threshold:
+            self.opened_at = time.time()
+            self.trips += 1
+            self._open()
+
+    def _open(self):
+        self.state = STATE_OPEN
+        self.retry_at = time.time() + self.backoff
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "backoff": self.backoff,
+            "retry_in": max(0.0, self.retry_at - time.time()) if self.retry_at else None,
+            "trips": self.trips,
+            "recoveries": self.recoveries,
+            "last_outage": self.last_outage,
+        }
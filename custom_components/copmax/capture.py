@@ -0,0 +1,319 @@
+"""Recording of the bus traffic, and replay of a recording as a Modbus client.
+
+A capture is a JSON lines file, gzip compressed when the name ends in .gz. The
+first line is a header, every other line is one request:
+
+    [time, function code, address, count, result, round trip, connected]
+
+time is seconds since the start of the capture. The function code is 0 for a
+connect. The result is the list of registers, the exception code of an
+exception response, or the message of a raised error. connected is the state
+of the client after the request, so reconnects are replayed as they happened.
+
+Kept free of pymodbus imports at module level, the recorder wraps whatever
+client the transport created.
+"""
+
+import asyncio
+from collections import deque
+import gzip
+import json
+import statistics
+import time
+
+from .const import (
+    CAPTURE_FLUSH_INTERVAL,
+    CAPTURE_VERSION,
+    HOLDING_REGISTER_CODE,
+    INPUT_REGISTER_CODE,
+    READ_WRITE_MULTIPLE_CODE,
+    WRITE_MULTIPLE_CODE,
+    WRITE_REGISTER_CODE,
+)
+
+CONNECT = 0
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class CaptureWriter:
+    """Capture file being written, shared by the clients of one poller.
+
+    Opens the file, so create and close it in the executor when in Home
+    Assistant.
+    """
+
+    def __init__(self, path: str, host: str, frame_delay: float):
+        self.path = path
+        self.requests = 0
+        self._started = time.monotonic()
+        self._flushed = self._started
+        self._file = _open(path, "w")
+        header = {
+            "version": CAPTURE_VERSION,
+            "host": host,
+            "started": time.time(),
+            # The pause before each request, not part of the round trips
+            "frame_delay": frame_delay,
+        }
+        self._file.write(json.dumps(header) + "\n")
+
+    def record(self, function_code, address, count, result, rtt, connected):
+        line = [
+            round(time.monotonic() - rtt - self._started, 4),
+            function_code,
+            address,
+            count,
+            result,
+            round(rtt, 4),
+            connected,
+        ]
+        self._file.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self.requests += 1
+        # Most of a capture survives a crash, without a flush per request
+        if time.monotonic() - self._flushed >= CAPTURE_FLUSH_INTERVAL:
+            self._file.flush()
+            self._flushed = time.monotonic()
+
+    def close(self):
+        self._file.close()
+
+
+class CaptureRecorder:
+    """Modbus client wrapper that records every request to a CaptureWriter."""
+
+    def __init__(self, client, writer: CaptureWriter):
+        self._client = client
+        self._writer = writer
+
+    @property
+    def connected(self) -> bool:
+        return self._client.connected
+
+    async def connect(self) -> bool:
+        started = time.monotonic()
+        connected = await self._client.connect()
+        self._writer.record(
+            CONNECT, 0, 0, None, time.monotonic() - started, self._client.connected
+        )
+        return connected
+
+    def close(self):
+        self._client.close()
+
+    async def read_holding_registers(self, address: int, count: int = 1, device_id: int = 1):
+        return await self._request(
+            HOLDING_REGISTER_CODE,
+            address,
+            count,
+            self._client.read_holding_registers(address, count=count, device_id=device_id),
+        )
+
+    async def read_input_registers(self, address: int, count: int = 1, device_id: int = 1):
+        return await self._request(
+            INPUT_REGISTER_CODE,
+            address,
+            count,
+            self._client.read_input_registers(address, count=count, device_id=device_id),
+        )
+
+    async def write_register(self, address: int, value: int, device_id: int = 1):
+        return await self._request(
+            WRITE_REGISTER_CODE,
+            address,
+            1,
+            self._client.write_register(address, value, device_id=device_id),
+        )
+
+    async def write_registers(self, address: int, values, device_id: int = 1):
+        return await self._request(
+            WRITE_MULTIPLE_CODE,
+            address,
+            len(values),
+            self._client.write_registers(address, values, device_id=device_id),
+        )
+
+    async def readwrite_registers(
+        self,
+        *,
+        read_address: int = 0,
+        read_count: int = 0,
+        write_address: int = 0,
+        values=(),
+        device_id: int = 1,
+    ):
+        # Recorded by the written registers, the poller reads back the same
+        return await self._request(
+            READ_WRITE_MULTIPLE_CODE,
+            write_address,
+            len(values),
+            self._client.readwrite_registers(
+                read_address=read_address,
+                read_count=read_count,
+                write_address=write_address,
+                values=values,
+                device_id=device_id,
+            ),
+        )
+
+    async def _request(self, function_code, address, count, request):
+        started = time.monotonic()
+        try:
+            resp = await request
+        except (Exception, asyncio.CancelledError) as ex:
+            # Cancelled when the deadline of the request passed
+            self._writer.record(
+                function_code,
+                address,
+                count,
+                f"{type(ex).__name__}: {ex!s}",
+                time.monotonic() - started,
+                self._client.connected,
+            )
+            raise
+
+        if resp.isError():
+            result = getattr(resp, "exception_code", None) or -1
+        else:
+            result = list(resp.registers)
+        self._writer.record(
+            function_code,
+            address,
+            count,
+            result,
+            time.monotonic() - started,
+            self._client.connected,
+        )
+        return resp
+
+
+def load_capture(path: str) -> tuple[dict, list]:
+    """Read a capture file, return the header and the requests."""
+    with _open(path, "r") as file:
+        header = json.loads(file.readline())
+        if header.get("version") != CAPTURE_VERSION:
+            raise ValueError(f"Unsupported capture version {header.get('version')}")
+        return header, [json.loads(line) for line in file if line.strip()]
+
+
+class ReplayClient:
+    """Modbus client answering from a capture, with the recorded timing.
+
+    Requests are matched by function code, address and count, in the recorded
+    order, so the error bursts and slow answers come back in the same places
+    of the poll. A request that is not in the capture, for example after the
+    read sizes were changed, is answered from the registers recorded so far
+    with the median round trip. time_scale multiplies every round trip, 0
+    replays as fast as possible when the frame delay is scaled the same way.
+    """
+
+    def __init__(self, requests: list, time_scale: float = 1.0):
+        self.time_scale = time_scale
+        self.unmatched = 0
+        self._connected = False
+        self._connects = deque()
+        self._requests = {}
+        self._image = {}
+        rtts = []
+        for request in requests:
+            function_code, address, count, result, rtt = request[1:6]
+            if function_code == CONNECT:
+                self._connects.append(request)
+                continue
+            self._requests.setdefault((function_code, address, count), deque()).append(
+                request
+            )
+            if isinstance(result, list):
+                rtts.append(rtt)
+        self._median_rtt = statistics.median(rtts) if rtts else 0.0
+
+    @property
+    def remaining(self) -> int:
+        """Recorded requests not replayed yet."""
+        return len(self._connects) + sum(len(q) for q in self._requests.values())
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    async def connect(self) -> bool:
+        if self._connects:
+            *_, rtt, connected = self._connects.popleft()
+            await asyncio.sleep(rtt * self.time_scale)
+            self._connected = connected
+        else:
+            self._connected = True
+        return self._connected
+
+    def close(self):
+        self._connected = False
+
+    async def read_holding_registers(self, address: int, count: int = 1, device_id: int = 1):
+        return await self._replay(HOLDING_REGISTER_CODE, address, count)
+
+    async def read_input_registers(self, address: int, count: int = 1, device_id: int = 1):
+        return await self._replay(INPUT_REGISTER_CODE, address, count)
+
+    async def write_register(self, address: int, value: int, device_id: int = 1):
+        return await self._replay(WRITE_REGISTER_CODE, address, 1, [value])
+
+    async def write_registers(self, address: int, values, device_id: int = 1):
+        return await self._replay(
+            WRITE_MULTIPLE_CODE, address, len(values), list(values)
+        )
+
+    async def readwrite_registers(
+        self,
+        *,
+        read_address: int = 0,
+        read_count: int = 0,
+        write_address: int = 0,
+        values=(),
+        device_id: int = 1,
+    ):
+        return await self._replay(
+            READ_WRITE_MULTIPLE_CODE, write_address, len(values), list(values)
+        )
+
+    async def _replay(self, function_code, address, count, written=None):
+        # Loaded only for a replay, see the module docstring
+        from pymodbus.exceptions import ModbusIOException
+
+        from .rtu import RtuResponse
+
+        recorded = self._requests.get((function_code, address, count))
+        if not recorded:
+            self.unmatched += 1
+            await asyncio.sleep(self._median_rtt * self.time_scale)
+            if written is not None:
+                self._remember(HOLDING_REGISTER_CODE, address, written)
+                return RtuResponse(function_code, written)
+            return RtuResponse(
+                function_code,
+                [
+                    self._image.get((function_code, a), 0)
+                    for a in range(address, address + count)
+                ],
+            )
+
+        *_, result, rtt, connected = recorded.popleft()
+        await asyncio.sleep(rtt * self.time_scale)
+        self._connected = connected
+        if isinstance(result, str):
+            raise ModbusIOException(result)
+        if isinstance(result, int):
+            return RtuResponse(function_code, exception_code=result)
+
+        if written is not None:
+            self._remember(HOLDING_REGISTER_CODE, address, result)
+        else:
+            self._remember(function_code, address, result)
+        return RtuResponse(function_code, result)
+
+    def _remember(self, register_code, address, values):
+        for offset, value in enumerate(values):
+            self._image[(register_code, address + offset)] = value
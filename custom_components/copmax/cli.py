@@ -0,0 +1,340 @@
+"""Command line poller, for measuring the bus without Home Assistant.
+
+Uses the same poller as the integration and imports nothing from Home
+Assistant. Run from the root of the repository:
+
+    python -m custom_components.copmax.cli --host 127.0.0.1 --port 5020 poll
+    python -m custom_components.copmax.cli --host 192.168.1.50 poll --json
+    python -m custom_components.copmax.cli --host 192.168.1.50 watch --interval 5
+    python -m custom_components.copmax.cli --host 192.168.1.50 bench --cycles 50
+    python -m custom_components.copmax.cli --host 192.168.1.50 write 39 3500
+    python -m custom_components.copmax.cli --host 192.168.1.50 probe
+
+Every command can record its requests with --record capture.jsonl.gz, a
+capture is replayed without a gateway, as recorded or faster:
+
+    python -m custom_components.copmax.cli replay capture.jsonl.gz --time-scale 0.1
+
+The register log of the integration is exported as CSV, for a time range:
+
+    python -m custom_components.copmax.cli log copmax_pump.ring --start 2024-05-01
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+import json
+import statistics
+import sys
+import time
+
+from .breaker import CircuitOpenError
+from .capture import CaptureWriter, ReplayClient, load_capture
+from .const import (
+    DEFAULT_BAUDRATE,
+    DEFAULT_FRAME_DELAY,
+    DEFAULT_MAX_REGISTERS,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    POLL_GROUPS,
+    TRANSPORT_TCP,
+    TRANSPORTS,
+)
+from .modbus_poll import CopmaxModbusPoll
+from .registers import REGISTERS
+from .ringlog import CopmaxRingLogReader
+
+# Registers of the map by address, derived values and local switches have none
+_BY_ADDRESS = {r.address: r for r in REGISTERS if isinstance(r.address, int)}
+
+
+def _create_poll(args, client=None) -> CopmaxModbusPoll:
+    poll = CopmaxModbusPoll(
+        args.host, args.port, args.transport, args.baudrate, client=client
+    )
+    poll.apply_options(
+        frame_delay=args.frame_delay,
+        timeout=args.timeout,
+        retries=args.retries,
+        max_registers=args.max_registers,
+        group_intervals={group: 0 for group in POLL_GROUPS},
+        group_max_ages={},
+    )
+    if args.capture is not None:
+        poll.start_capture(args.capture)
+    return poll
+
+
+async def _sweep(poll: CopmaxModbusPoll) -> tuple[float, bool]:
+    """Poll every group once, return the duration and if anything was read."""
+    started = time.perf_counter()
+    try:
+        success = await poll.poll_heat_pump_data()
+    except CircuitOpenError:
+        success = False
+    return time.perf_counter() - started, success
+
+
+def _percentiles(durations: list) -> dict:
+    percentiles = statistics.quantiles(durations, n=100, method="inclusive")
+    return {
+        "mean": statistics.fmean(durations),
+        "p50": percentiles[49],
+        "p90": percentiles[89],
+        "p99": percentiles[98],
+        "max": max(durations),
+    }
+
+
+def _print_percentiles(result: dict):
+    for name in ("mean", "p50", "p90", "p99", "max"):
+        print(f"  {name:5} {result[name] * 1000:8.1f} ms")
+
+
+def _rows(registers) -> list[dict]:
+    rows = []
+    for address, raw in sorted(registers.items()):
+        register = _BY_ADDRESS.get(address)
+        rows.append(
+            {
+                "address": address,
+                "key": register.key if register else None,
+                "name": register.name if register else None,
+                "raw": raw,
+                "value": raw / register.divisor if register else raw,
+                "unit": register.unit if register else None,
+            }
+        )
+    return rows
+
+
+def _print_table(rows: list[dict]):
+    for row in rows:
+        value = f"{row['value']:g} {row['unit'] or ''}".rstrip()
+        print(
+            f"{row['address']:>4}  {row['key'] or '':8} {row['name'] or '':42} "
+            f"{row['raw']:>6}  {value}"
+        )
+
+
+async def _poll(args):
+    poll = _create_poll(args)
+    duration, success = await _sweep(poll)
+    if not success:
+        raise SystemExit(f"No registers could be read from {args.host}:{args.port}")
+
+    rows = _rows(poll.snapshot().registers)
+    if args.json:
+        print(json.dumps({"duration": duration, "registers": rows}, indent=2))
+    else:
+        _print_table(rows)
+        print(f"{len(rows)} registers in {duration * 1000:.0f} ms")
+
+
+async def _watch(args):
+    poll = _create_poll(args)
+    previous = None
+    while True:
+        duration, success = await _sweep(poll)
+        snapshot = poll.snapshot(previous)
+        changed = {
+            (_BY_ADDRESS[a].key if a in _BY_ADDRESS else a): snapshot.registers[a]
+            for a in sorted(snapshot.changed)
+        }
+        status = "ok" if success else "failed"
+        print(
+            f"{time.strftime('%H:%M:%S')}  {duration * 1000:6.0f} ms  {status:6}  "
+            f"{len(snapshot.updated):3} read  changed: {changed}",
+            flush=True,
+        )
+        previous = snapshot
+        await asyncio.sleep(max(0.0, args.interval - duration))
+
+
+async def _bench(args):
+    poll = _create_poll(args)
+    durations = []
+    failures = 0
+    for _ in range(args.cycles):
+        duration, success = await _sweep(poll)
+        if success:
+            durations.append(duration)
+        else:
+            failures += 1
+
+    if len(durations) < 2:
+        raise SystemExit(f"{failures} of {args.cycles} cycles failed")
+
+    result = {"cycles": args.cycles, "failures": failures} | _percentiles(durations)
+    result["deadline"] = poll.deadline.as_dict()
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(
+        f"{args.cycles} cycles, {failures} failed, "
+        f"frame delay {args.frame_delay} s, "
+        f"max {args.max_registers or DEFAULT_MAX_REGISTERS} registers"
+    )
+    _print_percentiles(result)
+    deadline = result["deadline"]
+    print(
+        f"read deadline {deadline['read_deadline'] * 1000:.0f} ms, "
+        f"{deadline['missed']} missed"
+    )
+
+
+async def _replay(args):
+    header, requests = load_capture(args.capture_file)
+    client = ReplayClient(requests, args.time_scale)
+    args.host = header["host"]
+    poll = _create_poll(args, client)
+    # The recorded pause before each request, scaled like the round trips
+    poll.frame_delay = header.get("frame_delay", args.frame_delay) * args.time_scale
+
+    durations = []
+    failures = 0
+    while client.remaining:
+        remaining = client.remaining
+        duration, success = await _sweep(poll)
+        if not poll.breaker.allow_request():
+            # Only the bus time is replayed, not the idle time of the backoff
+            poll.breaker.retry_at = time.time()
+        if success:
+            durations.append(duration)
+        else:
+            failures += 1
+        if client.remaining == remaining:
+            break
+
+    if len(durations) < 2:
+        raise SystemExit(f"{failures} of {failures + len(durations)} cycles failed")
+
+    result = {
+        "requests": len(requests),
+        "cycles": failures + len(durations),
+        "failures": failures,
+        "breaker_trips": poll.breaker.trips,
+        "unmatched": client.unmatched,
+    } | _percentiles(durations)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(
+        f"{result['requests']} requests of {header['host']} in {result['cycles']} "
+        f"cycles, {failures} failed, {result['breaker_trips']} breaker trips, "
+        f"{client.unmatched} requests not in the capture"
+    )
+    _print_percentiles(result)
+
+
+async def _write(args):
+    poll = _create_poll(args)
+    written = await poll.modbus_write_holding_register(
+        args.address, args.value, args.multiplier
+    )
+    poll._client.close()
+    if written < 0:
+        raise SystemExit(f"Write of {args.value} to {args.address} failed")
+    print(f"Wrote {written} to holding register {args.address}")
+
+
+async def _probe(args):
+    poll = _create_poll(args)
+    try:
+        capabilities = await poll.probe_capabilities()
+    except ConnectionError as ex:
+        raise SystemExit(str(ex)) from ex
+    print(json.dumps(capabilities, indent=2))
+
+
+async def _log(args):
+    reader = CopmaxRingLogReader(args.log_file)
+    start = datetime.fromisoformat(args.start).timestamp() if args.start else None
+    end = datetime.fromisoformat(args.end).timestamp() if args.end else None
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as file:
+            rows = reader.export_csv(file, start, end)
+        print(f"{rows} of {len(reader)} records written to {args.output}")
+    else:
+        reader.export_csv(sys.stdout, start, end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", help="gateway host or serial port")
+    parser.add_argument("--port", type=int, default=502)
+    parser.add_argument("--transport", choices=TRANSPORTS, default=TRANSPORT_TCP)
+    parser.add_argument("--baudrate", type=int, default=DEFAULT_BAUDRATE)
+    parser.add_argument("--frame-delay", type=float, default=DEFAULT_FRAME_DELAY)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument(
+        "--max-registers",
+        type=int,
+        help=f"registers per read, default {DEFAULT_MAX_REGISTERS}",
+    )
+    parser.add_argument("--record", metavar="FILE", help="record the requests")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("poll", help="read all registers once")
+    command.add_argument("--json", action="store_true")
+    command.set_defaults(run=_poll)
+
+    command = commands.add_parser("watch", help="poll continuously")
+    command.add_argument("--interval", type=float, default=5.0)
+    command.set_defaults(run=_watch)
+
+    command = commands.add_parser("bench", help="time a number of polls")
+    command.add_argument("--cycles", type=int, default=20)
+    command.add_argument("--json", action="store_true")
+    command.set_defaults(run=_bench)
+
+    command = commands.add_parser("write", help="write a holding register")
+    command.add_argument("address", type=int)
+    command.add_argument("value", type=float)
+    command.add_argument("--multiplier", type=int, default=1)
+    command.set_defaults(run=_write)
+
+    command = commands.add_parser(
+        "probe", help="find the longest reads and the write requests supported"
+    )
+    command.set_defaults(run=_probe)
+
+    command = commands.add_parser("replay", help="poll against a recorded capture")
+    command.add_argument("capture_file")
+    command.add_argument(
+        "--time-scale",
+        type=float,
+        default=1.0,
+        help="factor on the round trips and the frame delay",
+    )
+    command.add_argument("--json", action="store_true")
+    command.set_defaults(run=_replay)
+
+    command = commands.add_parser("log", help="export a register log as CSV")
+    command.add_argument("log_file")
+    command.add_argument("--start", help="ISO time, e.g. 2024-05-01T06:00")
+    command.add_argument("--end", help="ISO time, not included")
+    command.add_argument("--output", metavar="FILE", help="instead of stdout")
+    command.set_defaults(run=_log)
+
+    args = parser.parse_args()
+    if args.host is None and args.command not in ("replay", "log"):
+        parser.error("--host is required")
+
+    args.capture = (
+        CaptureWriter(args.record, args.host, args.frame_delay) if args.record else None
+    )
+    try:
+        asyncio.run(args.run(args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.capture is not None:
+            args.capture.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Space heating of the heat pump as one climate entity."""
+
+from dataclasses import dataclass
+import logging
+
+from homeassistant.components.climate import (
+    ClimateEntity,
+    ClimateEntityDescription,
+    ClimateEntityFeature,
+    HVACMode,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+
+from .const import DOMAIN
+from .entity import CopmaxEntity, CopmaxEntityDescription
+from .registers import register_by_key
+from .snapshot import register_value
+
+_LOGGER = logging.getLogger(__name__)
+
+# Heating target and the output (flow) temperature it controls
+TARGET = register_by_key("H_ST02")
+CURRENT = register_by_key("I_ST")
+
+
+@dataclass(frozen=True, kw_only=True)
+class CopmaxClimateEntityDescription(
+    CopmaxEntityDescription, ClimateEntityDescription
+):
+    """Describes the Copmax climate entity."""
+
+
+def _value():
+    current = register_value(CURRENT.address, CURRENT.divisor)
+    target = register_value(TARGET.address, TARGET.divisor)
+    return lambda data: (current(data), target(data))
+
+
+DESCRIPTION = CopmaxClimateEntityDescription(
+    key="CLIMATE",
+    register=TARGET.address,
+    registers=(CURRENT.address,),
+    kind="HEATING",
+    value=_value(),
+    name="Heating",
+    icon="mdi:heat-pump",
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, config: ConfigEntry, async_add_entities
+):
+    """Set up the climate platform."""
+    coordinator = hass.data[DOMAIN][config.entry_id]._coordinator
+
+    async_add_entities([CopmaxClimate(coordinator, DESCRIPTION)])
+
+
+class CopmaxClimate(CopmaxEntity, ClimateEntity):
+    """Heating target of the heat pump.
+
+    Only heat is offered, the values of the operating mode register are not
+    known well enough to map them to HVAC modes.
+    """
+
+    entity_description: CopmaxClimateEntityDescription
+    _attr_temperature_unit = UnitOfTemperature.CELSIUS
+    _attr_min_temp = TARGET.minimum
+    _attr_max_temp = TARGET.maximum
+    _attr_target_temperature_step = TARGET.step
+    _attr_hvac_modes = [HVACMode.HEAT]
+    _attr_hvac_mode = HVACMode.HEAT
+    _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
+    _enable_turn_on_off_backwards_compatibility = False
+
+    def _set_value(self, value) -> None:
+        self._attr_current_temperature, self._attr_target_temperature = value
+
+    async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
+        """Heat is the only mode."""
+        if hvac_mode != HVACMode.HEAT:
+            raise ServiceValidationError(
+                f"'{self.coordinator.alias}' only heats, {hvac_mode} is not supported"
+            )
+
+    async def async_set_temperature(self, **kwargs) -> None:
+        if (temperature := kwargs.get(ATTR_TEMPERATURE)) is None:
+            return
+        values = {TARGET.address: round(temperature * TARGET.divisor)}
+        _LOGGER.info(f"Sending {values} to device...")
+        if not await self.coordinator.async_write_registers(values):
+            _LOGGER.error(f"Writing {values} to '{self.coordinator.alias}' failed")
+            return
+
+        self._attr_target_temperature = values[TARGET.address] / TARGET.divisor
+        self.async_write_ha_state()
@@ -6,10 +6,56 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries, core, exceptions
-from homeassistant.const import CONF_ALIAS
+from homeassistant.const import CONF_ALIAS, CONF_SCAN_INTERVAL
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
-from .const import CONF_INVERTER_HOST, CONF_INVERTER_POLL, CONF_INVERTER_PORT, DOMAIN
+from .const import (
+    CONF_BAUDRATE,
+    CONF_CAPABILITIES,
+    CONF_DISCOVERY,
+    CONF_FAST_POLL_INTERVAL,
+    CONF_FAST_POLL_THRESHOLD,
+    CONF_FLOW_RATE,
+    CONF_FRAME_DELAY,
+    CONF_GROUP_INTERVAL,
+    CONF_GROUP_MAX_AGE,
+    CONF_INVERTER_HOST,
+    CONF_INVERTER_POLL,
+    CONF_INVERTER_PORT,
+    CONF_LINK_PROFILE,
+    CONF_MAX_REGISTERS,
+    CONF_POWER_ENTITY,
+    CONF_PROXY_HOST,
+    CONF_PROXY_PORT,
+    CONF_REGISTER_LOG_SIZE,
+    CONF_RETRIES,
+    CONF_STATISTICS_WINDOW,
+    CONF_TEMP_DEADBAND,
+    CONF_TEMP_DEADBAND_RELATIVE,
+    CONF_TIMEOUT,
+    CONF_TRANSPORT,
+    DEFAULT_BAUDRATE,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_FAST_POLL_THRESHOLD,
+    DEFAULT_FLOW_RATE,
+    DEFAULT_FRAME_DELAY,
+    DEFAULT_GROUP_INTERVAL,
+    DEFAULT_GROUP_MAX_AGE,
+    DEFAULT_PROXY_HOST,
+    DEFAULT_PROXY_PORT,
+    DEFAULT_REGISTER_LOG_SIZE,
+    DEFAULT_RETRIES,
+    DEFAULT_STATISTICS_WINDOW,
+    DEFAULT_TIMEOUT,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+    POLL_GROUPS,
+    TRANSPORT_TCP,
+    TRANSPORTS,
+)
+from .modbus_poll import CopmaxModbusPoll
+from .transport import client_class
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,7 +63,14 @@ STEP_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_INVERTER_HOST, default=None): str,
         vol.Required(CONF_INVERTER_PORT, default=502): int,
-        vol.Optional(CONF_INVERTER_POLL, default=5): int,
+        vol.Optional(CONF_TRANSPORT, default=TRANSPORT_TCP): vol.In(TRANSPORTS),
+        vol.Optional(CONF_BAUDRATE, default=DEFAULT_BAUDRATE): int,
+        vol.Optional(CONF_INVERTER_POLL, default=DEFAULT_UPDATE_INTERVAL): vol.All(
+            int, vol.Range(min=DEFAULT_FAST_POLL_INTERVAL)
+        ),
+        vol.Optional(CONF_FLOW_RATE, default=DEFAULT_FLOW_RATE): vol.Coerce(float),
+        vol.Optional(CONF_POWER_ENTITY, default=""): str,
+        vol.Optional(CONF_STATISTICS_WINDOW, default=DEFAULT_STATISTICS_WINDOW): int,
     }
 )
 STEP_DATA_ALIAS = vol.Schema(
@@ -34,13 +87,34 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         errors = {}
         if user_input is not None:
             try:
                 self._userInput = user_input
+                # Import the pymodbus client off the event loop
+                await self.hass.async_add_import_executor_job(
+                    client_class, user_input[CONF_TRANSPORT]
+                )
+                (
+                    self._userInput[CONF_LINK_PROFILE],
+                    self._userInput[CONF_CAPABILITIES],
+                ) = await validate_connection(
+                    user_input[CONF_INVERTER_HOST],
+                    user_input[CONF_INVERTER_PORT],
+                    user_input[CONF_TRANSPORT],
+                    user_input[CONF_BAUDRATE],
+                )
                 return await self.async_step_alias()
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
@@ -62,9 +136,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
+                profile = self._userInput[CONF_LINK_PROFILE]
                 return self.async_create_entry(
                     title=f"{self._userInput[CONF_ALIAS]}  ({self._userInput[CONF_INVERTER_HOST]}:{self._userInput[CONF_INVERTER_PORT]})",
                     data=self._userInput,
+                    options={
+                        # The interval of the setup form is the first option
+                        CONF_SCAN_INTERVAL: self._userInput[CONF_INVERTER_POLL],
+                        CONF_FRAME_DELAY: profile["frame_delay"],
+                        CONF_TIMEOUT: profile["timeout"],
+                    },
                 )
 
         return self.async_show_form(
@@ -72,5 +153,128 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+async def validate_connection(
+    host: str, port: int, transport: str, baudrate: int
+) -> tuple[dict, dict]:
+    """Connect to the heat pump, return the link profile and the capabilities."""
+    poll = CopmaxModbusPoll(host, port, transport, baudrate)
+    try:
+        profile = await poll.profile_link()
+        poll.frame_delay = profile["frame_delay"]
+        return profile, await poll.probe_capabilities()
+    except ConnectionError as ex:
+        raise CannotConnect from ex
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the tuning options, applied to the running entry without a reload."""
+
+    def __init__(self, config_entry):
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        # Flow rate, power sensor and statistics window were set up with the
+        # entry, until changed here
+        data = self._entry.data
+        options = {
+            CONF_FLOW_RATE: data.get(CONF_FLOW_RATE, DEFAULT_FLOW_RATE),
+            CONF_POWER_ENTITY: data.get(CONF_POWER_ENTITY, ""),
+            CONF_STATISTICS_WINDOW: data.get(
+                CONF_STATISTICS_WINDOW, DEFAULT_STATISTICS_WINDOW
+            ),
+        } | self._entry.options
+        return self.async_show_form(
+            step_id="init", data_schema=self._options_schema(options)
+        )
+
+    @staticmethod
+    def _options_schema(options):
+        schema = {
+            vol.Optional(
+                CONF_SCAN_INTERVAL,
+                default=options.get(CONF_SCAN_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+            ): vol.All(int, vol.Range(min=DEFAULT_FAST_POLL_INTERVAL)),
+        }
+        for group in POLL_GROUPS:
+            key = CONF_GROUP_INTERVAL.format(group)
+            schema[
+                vol.Optional(key, default=options.get(key, DEFAULT_GROUP_INTERVAL))
+            ] = vol.All(int, vol.Range(min=0))
+        for group in POLL_GROUPS:
+            key = CONF_GROUP_MAX_AGE.format(group)
+            schema[
+                vol.Optional(key, default=options.get(key, DEFAULT_GROUP_MAX_AGE))
+            ] = vol.All(int, vol.Range(min=1))
+        schema |= {
+            vol.Optional(
+                CONF_FRAME_DELAY,
+                default=options.get(CONF_FRAME_DELAY, DEFAULT_FRAME_DELAY),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+            vol.Optional(
+                CONF_TIMEOUT, default=options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+            ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=30)),
+            vol.Optional(
+                CONF_RETRIES, default=options.get(CONF_RETRIES, DEFAULT_RETRIES)
+            ): vol.All(int, vol.Range(min=0, max=5)),
+            # Left empty, reads are as long as the heat pump answers
+            vol.Optional(
+                CONF_MAX_REGISTERS,
+                description={"suggested_value": options.get(CONF_MAX_REGISTERS)},
+            ): vol.All(int, vol.Range(min=1, max=125)),
+            vol.Optional(
+                CONF_FAST_POLL_THRESHOLD,
+                default=options.get(
+                    CONF_FAST_POLL_THRESHOLD, DEFAULT_FAST_POLL_THRESHOLD
+                ),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_FAST_POLL_INTERVAL,
+                default=options.get(CONF_FAST_POLL_INTERVAL, DEFAULT_FAST_POLL_INTERVAL),
+            ): vol.All(int, vol.Range(min=DEFAULT_FAST_POLL_INTERVAL)),
+            # Left empty, the deadbands of the register map apply
+            vol.Optional(
+                CONF_TEMP_DEADBAND,
+                description={"suggested_value": options.get(CONF_TEMP_DEADBAND)},
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_TEMP_DEADBAND_RELATIVE,
+                description={
+                    "suggested_value": options.get(CONF_TEMP_DEADBAND_RELATIVE)
+                },
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+            vol.Optional(
+                CONF_STATISTICS_WINDOW,
+                default=options.get(CONF_STATISTICS_WINDOW, DEFAULT_STATISTICS_WINDOW),
+            ): vol.All(int, vol.Range(min=0)),
+            vol.Optional(
+                CONF_DISCOVERY, default=options.get(CONF_DISCOVERY, False)
+            ): bool,
+            vol.Optional(
+                CONF_PROXY_PORT,
+                default=options.get(CONF_PROXY_PORT, DEFAULT_PROXY_PORT),
+            ): vol.All(int, vol.Range(min=0, max=65535)),
+            vol.Optional(
+                CONF_PROXY_HOST,
+                default=options.get(CONF_PROXY_HOST, DEFAULT_PROXY_HOST),
+            ): str,
+            vol.Optional(
+                CONF_REGISTER_LOG_SIZE,
+                default=options.get(CONF_REGISTER_LOG_SIZE, DEFAULT_REGISTER_LOG_SIZE),
+            ): vol.All(int, vol.Range(min=0, max=1024)),
+            vol.Optional(
+                CONF_FLOW_RATE, default=options.get(CONF_FLOW_RATE, DEFAULT_FLOW_RATE)
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_POWER_ENTITY, default=options.get(CONF_POWER_ENTITY, "")
+            ): str,
+        }
+        return vol.Schema(schema)
+
+
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -12,7 +12,126 @@ CONF_INVERTER_PORT = "inverter_port"
 CONF_INVERTER_POLL = "scan_interval"
 DEFAULT_INVERTER_POLLRATE = 5
 
+# Transport to the RS-485 bus
+CONF_TRANSPORT = "transport"
+CONF_BAUDRATE = "baudrate"
+TRANSPORT_TCP = "tcp"  # Modbus TCP gateway
+TRANSPORT_RTU_OVER_TCP = "rtu_over_tcp"  # transparent gateway, raw RTU frames
+TRANSPORT_SERIAL = "serial"  # local RS-485 adapter, host is the device path
+TRANSPORTS = [TRANSPORT_TCP, TRANSPORT_RTU_OVER_TCP, TRANSPORT_SERIAL]
+DEFAULT_BAUDRATE = 9600
+
+# Derived thermal power / COP
+CONF_FLOW_RATE = "flow_rate"
+CONF_POWER_ENTITY = "power_entity"
+DEFAULT_FLOW_RATE = 0.0  # l/min, 0 disables the derived sensors
+WATER_HEAT_CAPACITY = 4186  # J/(kg*K)
+COP_WINDOW = 3600  # seconds of history in the rolling COP
+DERIVED_MAX_GAP = 300  # seconds, longer gaps are not integrated
+
+# Downsampling and long-term statistics
+CONF_STATISTICS_WINDOW = "statistics_window"
+DEFAULT_STATISTICS_WINDOW = 0  # seconds, 0 writes the state on every poll
+STATISTICS_PERIOD = 3600  # seconds, long-term statistics are hourly
+
+# Deadband filtering of published states
+DEFAULT_TEMP_DEADBAND = 0.1  # degC
+DEFAULT_TEMP_DEADBAND_RELATIVE = 0.003  # of the last value, 0.18 degC at 60 degC
+DEADBAND_MAX_AGE = 300  # seconds, publish at least this often
+
+# Options, tunable on a running entry
+CONF_FRAME_DELAY = "frame_delay"
+CONF_TIMEOUT = "timeout"
+CONF_RETRIES = "retries"
+CONF_MAX_REGISTERS = "max_registers"
+CONF_FAST_POLL_THRESHOLD = "fast_poll_threshold"
+CONF_FAST_POLL_INTERVAL = "fast_poll_interval"
+CONF_TEMP_DEADBAND = "temp_deadband"
+CONF_TEMP_DEADBAND_RELATIVE = "temp_deadband_relative"  # percent
+CONF_GROUP_INTERVAL = "interval_{}"
+CONF_GROUP_MAX_AGE = "max_age_{}"
+
+DEFAULT_UPDATE_INTERVAL = 15  # seconds
+DEFAULT_FRAME_DELAY = 0.7  # seconds
+DEFAULT_TIMEOUT = 3  # seconds
+DEFAULT_RETRIES = 0
+DEFAULT_MAX_REGISTERS = 8
+DEFAULT_FAST_POLL_THRESHOLD = 0.0  # degC change per poll, 0 disables
+DEFAULT_FAST_POLL_INTERVAL = 5  # seconds
+DEFAULT_GROUP_INTERVAL = 0  # seconds, 0 polls the group on every update
+DEFAULT_GROUP_MAX_AGE = 300  # seconds before a register value is stale
+
+# Salvage of failed block reads
+BISECT_BUDGET = 6  # extra requests per failed block read
+BAD_REGISTER_LIMIT = 3  # failed single reads before a register is excluded
+BAD_REGISTER_RETRY = 600  # seconds between single reads of an excluded register
+
+# Circuit breaker when the heat pump or gateway is offline
+BREAKER_THRESHOLD = 3  # failed polls in a row before opening
+BREAKER_BASE_BACKOFF = 30  # seconds
+BREAKER_MAX_BACKOFF = 600  # seconds
+
+# Per-request deadlines, see deadline.py
+DEADLINE_SAMPLES = 200  # round trips kept per poller
+DEADLINE_MIN_SAMPLES = 20  # before that the flat timeout is used
+DEADLINE_PERCENTILE = 99
+DEADLINE_FACTOR = 2  # times the observed gateway overhead
+DEADLINE_MIN_MARGIN = 0.1  # seconds on top of the frame time, at least
+
+# Fleet scheduler shared by all entries, see scheduler.py
+DATA_SCHEDULER = "scheduler"
+SCHEDULER_JITTER = 0.25  # random delay, as part of the spacing between entries
+HOST_CONCURRENCY = 1  # polls and writes at the same time through one gateway
+
+# Discovery of registers outside of the register map, see discovery.py
+CONF_DISCOVERY = "discovery"
+DISCOVERY_ADDRESSES = range(128)  # probed for input and holding registers
+DISCOVERY_STORE_VERSION = 1
+DISCOVERY_SAVE_DELAY = 300  # seconds
+
+# Recording of the bus traffic, see capture.py
+CAPTURE_VERSION = 1
+CAPTURE_FLUSH_INTERVAL = 5  # seconds
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+
+# Setpoint schedule, see schedule.py
+SCHEDULE_STORE_VERSION = 1
+SERVICE_SET_SCHEDULE = "set_schedule"
+
+# Modbus TCP proxy serving the register image, see proxy.py
+CONF_PROXY_PORT = "proxy_port"
+DEFAULT_PROXY_PORT = 0  # 0 disables the proxy
+CONF_PROXY_HOST = "proxy_host"
+DEFAULT_PROXY_HOST = "127.0.0.1"  # 0.0.0.0 for all interfaces, no access control
+
+# Register log at full poll resolution, see ringlog.py
+CONF_REGISTER_LOG_SIZE = "register_log_size"
+DEFAULT_REGISTER_LOG_SIZE = 0  # MB, 0 disables the log
+
+# Link profiling in the config flow
+CONF_LINK_PROFILE = "link_profile"
+
+# Request shapes the heat pump supports, see probe_capabilities in modbus_poll.py
+CONF_CAPABILITIES = "capabilities"
+SERVICE_PROBE_CAPABILITIES = "probe_capabilities"
+PROFILE_READ_SIZES = (1, 6, 12, 21)  # input registers 0..20
+PROFILE_SAMPLES = 2
+PROFILE_FRAME_DELAYS = (0.0, 0.1, 0.2, 0.4, DEFAULT_FRAME_DELAY)
+
 INT16 = "int16"
 
 HOLDING_REGISTER_CODE = 0x03
 INPUT_REGISTER_CODE = 0x04
+WRITE_REGISTER_CODE = 0x06
+WRITE_MULTIPLE_CODE = 0x10
+READ_WRITE_MULTIPLE_CODE = 0x17
+MAX_WRITE = 123  # registers per write multiple, from the Modbus specification
+
+# Register groups: name -> (register code, first register, count, signed)
+POLL_GROUPS = {
+    "temperatures": (INPUT_REGISTER_CODE, 0, 6, True),
+    "user_settings": (HOLDING_REGISTER_CODE, 38, 19, True),
+    "status": (INPUT_REGISTER_CODE, 6, 15, False),
+    "special_functions": (HOLDING_REGISTER_CODE, 24, 14, True),
+}
@@ -0,0 +1,581 @@
+"""Coordinator polling the heat pump for the CustomIntegration entities."""
+
+from contextlib import nullcontext
+from datetime import timedelta
+import logging
+import math
+import time
+
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util, slugify
+
+from .breaker import STATE_CLOSED, CircuitOpenError
+from .capture import CaptureWriter
+from .const import (
+    CONF_CAPABILITIES,
+    CONF_FAST_POLL_INTERVAL,
+    CONF_FAST_POLL_THRESHOLD,
+    CONF_FRAME_DELAY,
+    CONF_GROUP_INTERVAL,
+    CONF_GROUP_MAX_AGE,
+    CONF_MAX_REGISTERS,
+    CONF_RETRIES,
+    CONF_STATISTICS_WINDOW,
+    CONF_TEMP_DEADBAND,
+    CONF_TEMP_DEADBAND_RELATIVE,
+    CONF_TIMEOUT,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_FAST_POLL_THRESHOLD,
+    DEFAULT_FRAME_DELAY,
+    DEFAULT_GROUP_INTERVAL,
+    DEFAULT_GROUP_MAX_AGE,
+    DEFAULT_PROXY_HOST,
+    DEFAULT_RETRIES,
+    DEFAULT_STATISTICS_WINDOW,
+    DEFAULT_TIMEOUT,
+    DEFAULT_UPDATE_INTERVAL,
+    DEVICE_MANUCFACTURER,
+    DEVICE_MODEL,
+    DISCOVERY_SAVE_DELAY,
+    DISCOVERY_STORE_VERSION,
+    DOMAIN,
+    POLL_GROUPS,
+    SCHEDULE_STORE_VERSION,
+    STATISTICS_PERIOD,
+)
+from .derived import CopmaxDerivedValues
+from .discovery import CopmaxDiscovery
+from .history import CopmaxRegisterHistory
+from .modbus_poll import CopmaxModbusPoll
+from .proxy import CopmaxModbusProxy
+from .registers import REGISTERS
+from .ringlog import RECORD, CopmaxRingLog
+from .schedule import CopmaxSchedule, register_diff
+from .scheduler import CopmaxScheduler
+from .snapshot import CopmaxSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CopmaxCoordinator(DataUpdateCoordinator[CopmaxSnapshot]):
+    """CustomIntegration coordinator."""
+
+    def __init__(
+        self, hass, copmaxPoll: CopmaxModbusPoll, alias: str, pollinterval: int
+    ):
+        """Initialize my coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            # Name of the data. For logging purposes.
+            name=f"CustomIntegration coordinator for '{alias}'",
+            # Polling interval. Will only be polled if there are subscribers.
+            update_interval=timedelta(seconds=15),
+        )
+        self.copmaxModbusPoll = copmaxPoll
+        self.alias = alias
+        # Shared by all entities of the entry
+        self.device_info = DeviceInfo(
+            identifiers={(DOMAIN, alias)},
+            manufacturer=DEVICE_MANUCFACTURER,
+            model=DEVICE_MODEL,
+            name=alias,
+        )
+        self.derived: CopmaxDerivedValues | None = None
+        self.power_entity: str | None = None
+
+        # Normal and fast update interval, see apply_options
+        self.normal_interval = self.update_interval
+        self.fast_interval = timedelta(seconds=DEFAULT_FAST_POLL_INTERVAL)
+        self.fast_poll_threshold = DEFAULT_FAST_POLL_THRESHOLD
+        # Deadbands set in the options, None keeps those of the register map
+        self.temp_deadband = None
+        self.temp_deadband_relative = None
+        self._last_temperatures = None
+
+        # Raw temperature samples, enough for one statistics period plus margin
+        # even when fast polling
+        self.statistics_window = DEFAULT_STATISTICS_WINDOW
+        self.statistics_names = {
+            register.address: (register.key, register.name)
+            for register in REGISTERS
+            if register.kind == "TEMP"
+        }
+        self.history = CopmaxRegisterHistory(
+            range(6),
+            math.ceil(STATISTICS_PERIOD * 1.25 / DEFAULT_FAST_POLL_INTERVAL),
+        )
+        self._statistics_hour = None
+
+        # States not written because the change was inside the deadband
+        self.suppressed_updates = 0
+
+        # Shared by all entries, spreads the polls and limits them per gateway
+        self.scheduler: CopmaxScheduler | None = None
+
+        # Opt-in probing of registers outside of the register map
+        self.discovery: CopmaxDiscovery | None = None
+        self._discovery_store: Store | None = None
+
+        # Optional Modbus TCP server for other clients, see async_set_proxy
+        self.proxy: CopmaxModbusProxy | None = None
+
+        # Every snapshot at full resolution, see async_set_register_log
+        self.register_log: CopmaxRingLog | None = None
+
+        # Setpoint schedule of the entry, see async_load_schedule
+        self.schedule = CopmaxSchedule([])
+        self._schedule_store: Store | None = None
+        self._schedule_start = None
+        self._unsub_schedule = None
+        self.schedule_writes = 0
+        self.schedule_skips = 0
+
+    async def _async_update_data(self) -> CopmaxSnapshot:
+        """Poll the heat pump and return a snapshot of the register image."""
+        slot = self.scheduler.slot(self) if self.scheduler else nullcontext()
+        async with slot:
+            try:
+                success = await self.copmaxModbusPoll.poll_heat_pump_data()
+            except CircuitOpenError as e:
+                raise UpdateFailed(str(e)) from e
+            except Exception as e:
+                raise UpdateFailed(f"Polling '{self.alias}' failed: {e}") from e
+
+            if not success:
+                raise UpdateFailed(f"No registers could be read from '{self.alias}'")
+
+        self._adapt_interval()
+        self._update_history()
+        derived = None
+        if self.derived is not None:
+            self._update_derived()
+            derived = {
+                "heat_power": self.derived.heat_power,
+                "cop": self.derived.cop,
+                "energy_today": self.derived.energy_today,
+            }
+
+        if self.discovery is not None and self.scheduler is not None:
+            self.config_entry.async_create_background_task(
+                self.hass, self._async_discover(), f"{self.name} discovery"
+            )
+
+        snapshot = self.copmaxModbusPoll.snapshot(self.data, derived)
+        if self.register_log is not None:
+            self.register_log.append(snapshot.time, snapshot.registers)
+        return snapshot
+
+    async def async_set_discovery(self, enabled: bool) -> None:
+        """Start or stop the register discovery, results are kept in a Store."""
+        if not enabled:
+            self.discovery = None
+            return
+        if self.discovery is not None:
+            return
+
+        self._discovery_store = Store(
+            self.hass,
+            DISCOVERY_STORE_VERSION,
+            f"{DOMAIN}.discovery.{self.config_entry.entry_id}",
+        )
+        self.discovery = CopmaxDiscovery(await self._discovery_store.async_load())
+
+    async def async_set_proxy(self, port: int, host: str = DEFAULT_PROXY_HOST) -> None:
+        """Start, move or stop the Modbus proxy, port 0 stops it."""
+        if self.proxy is not None:
+            if (self.proxy.host, self.proxy.port) == (host, port):
+                return
+            await self.proxy.async_stop()
+            self.proxy = None
+        if not port:
+            return
+
+        proxy = CopmaxModbusProxy(self, port, host)
+        try:
+            await proxy.async_start()
+        except OSError as ex:
+            _LOGGER.error(f"Modbus proxy of '{self.alias}' not started: {ex!s}")
+            return
+        self.proxy = proxy
+
+    async def async_set_register_log(self, size: int) -> None:
+        """Start, resize or stop the register log, size in MB, 0 stops it."""
+        capacity = size * 1024 * 1024 // RECORD.size
+        log = self.register_log
+        if log is not None:
+            if log.capacity == capacity:
+                return
+            self.register_log = None
+            await self.hass.async_add_executor_job(log.close)
+        if not capacity:
+            return
+
+        self.register_log = await self.hass.async_add_executor_job(
+            CopmaxRingLog,
+            self.hass.config.path(f"copmax_{slugify(self.alias)}.ring"),
+            capacity,
+        )
+
+    async def _async_discover(self) -> None:
+        """Probe one unknown register, only while the gateway is idle.
+
+        Runs after a poll, at the lowest priority: nothing is sent when the
+        gateway is busy or another poll is due before the probe could time out.
+        """
+        poll = self.copmaxModbusPoll
+        if poll.breaker.state != STATE_CLOSED or not self.scheduler.is_idle(
+            self, poll.frame_delay + 2 * poll.timeout
+        ):
+            return
+
+        discovery = self.discovery
+        target = discovery.next_target()
+        if target is None:
+            return
+
+        async with self.scheduler.host_lock(self):
+            status, value = await poll.probe_register(*target)
+        discovery.record(*target, status, value)
+        self._discovery_store.async_delay_save(
+            lambda: discovery.results, DISCOVERY_SAVE_DELAY
+        )
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh in the slot given by the fleet scheduler."""
+        if self.scheduler is None:
+            super()._schedule_refresh()
+            return
+
+        if self.config_entry and self.config_entry.pref_disable_polling:
+            return
+
+        # Same as DataUpdateCoordinator, only the time of the refresh differs
+        self._async_unsub_refresh()
+        self._unsub_refresh = self.hass.loop.call_at(
+            self.scheduler.next_refresh(self), self.hass.async_run_hass_job, self._job
+        ).cancel
+
+    def _host_lock(self):
+        return self.scheduler.host_lock(self) if self.scheduler else nullcontext()
+
+    async def async_write_register(
+        self, register: int, value, multiplier: int = 1
+    ) -> int:
+        """Write a holding register, waiting for the gateway if it is busy."""
+        async with self._host_lock():
+            return await self.copmaxModbusPoll.modbus_write_holding_register(
+                register, value, multiplier
+            )
+
+    async def async_write_registers(self, values: dict) -> bool:
+        """Write several holding registers with one hold of the gateway.
+
+        values maps address to the signed value as stored in the register, so
+        a mode and a setpoint change go out back to back, without a poll in
+        between. Only contiguous registers are written with one request.
+        """
+        async with self._host_lock():
+            return await self.copmaxModbusPoll.modbus_write_holding_registers(values)
+
+    async def async_probe_capabilities(self) -> dict:
+        """Probe the request shapes of the heat pump, use and keep them.
+
+        The profile is saved in the config entry. Reads are split at the
+        shorter of the longest read the heat pump answers and the registers
+        per request option. Raises ConnectionError if the heat pump does not
+        answer.
+        """
+        poll = self.copmaxModbusPoll
+        async with self._host_lock():
+            capabilities = await poll.probe_capabilities()
+        poll.apply_capabilities(capabilities)
+
+        entry = self.config_entry
+        self.hass.config_entries.async_update_entry(
+            entry, data=entry.data | {CONF_CAPABILITIES: capabilities}
+        )
+        return capabilities
+
+    async def async_start_capture(self, path: str) -> str:
+        """Record the bus traffic to a capture file, return the file in use."""
+        poll = self.copmaxModbusPoll
+        if poll.capture is not None:
+            return poll.capture.path
+
+        writer = await self.hass.async_add_executor_job(
+            CaptureWriter, path, self.alias, poll.frame_delay
+        )
+        # Between polls, so a poll is recorded completely
+        async with self._host_lock():
+            poll.start_capture(writer)
+        _LOGGER.info(f"Recording the bus traffic of '{self.alias}' to {path}")
+        return path
+
+    async def async_stop_capture(self) -> None:
+        """Stop recording the bus traffic."""
+        async with self._host_lock():
+            writer = self.copmaxModbusPoll.stop_capture()
+        if writer is not None:
+            await self.hass.async_add_executor_job(writer.close)
+            _LOGGER.info(
+                f"Recorded {writer.requests} requests of '{self.alias}' to {writer.path}"
+            )
+
+    async def async_load_schedule(self) -> None:
+        """Load the saved schedule and bring the registers to the slot in force."""
+        self._schedule_store = Store(
+            self.hass,
+            SCHEDULE_STORE_VERSION,
+            f"{DOMAIN}.schedule.{self.config_entry.entry_id}",
+        )
+        try:
+            self.schedule = CopmaxSchedule(
+                await self._schedule_store.async_load() or []
+            )
+        except ValueError as ex:
+            _LOGGER.error(f"Saved schedule of '{self.alias}' not used: {ex!s}")
+            return
+        self._track_schedule()
+        await self.async_apply_schedule()
+
+    async def async_set_schedule(self, slots: list[dict]) -> None:
+        """Replace and save the schedule, raises ValueError on an invalid slot."""
+        self.schedule = CopmaxSchedule(slots)
+        await self._schedule_store.async_save(slots)
+        self._track_schedule()
+        await self.async_apply_schedule()
+
+    @callback
+    def _track_schedule(self) -> None:
+        """Wake up at the next slot boundary, if there is a schedule."""
+        self.stop_schedule()
+        self._schedule_start = self.schedule.next_start(dt_util.now())
+        if self._schedule_start is not None:
+            self._unsub_schedule = async_track_point_in_time(
+                self.hass, self._async_schedule_boundary, self._schedule_start
+            )
+
+    @callback
+    def stop_schedule(self) -> None:
+        if self._unsub_schedule is not None:
+            self._unsub_schedule()
+            self._unsub_schedule = None
+
+    async def _async_schedule_boundary(self, now) -> None:
+        # The slot of the boundary, also if the timer fires a little early
+        start = self._schedule_start
+        self._unsub_schedule = None
+        self._track_schedule()
+        await self.async_apply_schedule(start)
+
+    async def async_apply_schedule(self, now=None) -> None:
+        """Write the registers of the slot in force that differ from the image.
+
+        All differences go out as one batch, nothing is sent when the image
+        already holds the profile.
+        """
+        if not self.schedule:
+            return
+        values = register_diff(self.schedule.active(now or dt_util.now()), self.data)
+        if not values:
+            self.schedule_skips += 1
+            return
+
+        _LOGGER.info(f"Schedule of '{self.alias}' writing {values}")
+        if not await self.async_write_registers(values):
+            _LOGGER.error(f"Schedule of '{self.alias}' could not write {values}")
+            return
+        self.schedule_writes += 1
+        await self.async_request_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners of registers that were read or went stale.
+
+        Entities subscribe with their register, or a frozenset of registers, as
+        context. After a failed poll, and for listeners without a register,
+        everybody is updated.
+        """
+        data = self.data
+        if not self.last_update_success or data is None:
+            super().async_update_listeners()
+            return
+
+        for update_callback, register in list(self._listeners.values()):
+            if isinstance(register, int):
+                if register in data.updated or not data.is_fresh(register):
+                    update_callback()
+            elif (
+                not isinstance(register, frozenset)
+                or not data.updated.isdisjoint(register)
+                or not all(map(data.is_fresh, register))
+            ):
+                update_callback()
+
+    async def async_apply_options(self, options) -> None:
+        """Apply changed options between polls.
+
+        A new timeout replaces the client, which would drop the connection of
+        a poll in flight and count its requests as failed.
+        """
+        async with self._host_lock():
+            self.apply_options(options)
+
+    def apply_options(self, options):
+        """Apply the options of the config entry to the coordinator and poller."""
+        self.normal_interval = timedelta(
+            seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+        )
+        self.fast_interval = timedelta(
+            seconds=options.get(CONF_FAST_POLL_INTERVAL, DEFAULT_FAST_POLL_INTERVAL)
+        )
+        self.fast_poll_threshold = options.get(
+            CONF_FAST_POLL_THRESHOLD, DEFAULT_FAST_POLL_THRESHOLD
+        )
+        # Set up with the entry, until changed in the options
+        self.statistics_window = options.get(
+            CONF_STATISTICS_WINDOW,
+            self.config_entry.data.get(
+                CONF_STATISTICS_WINDOW, DEFAULT_STATISTICS_WINDOW
+            ),
+        )
+        self.temp_deadband = options.get(CONF_TEMP_DEADBAND)
+        relative = options.get(CONF_TEMP_DEADBAND_RELATIVE)
+        self.temp_deadband_relative = None if relative is None else relative / 100
+        self.update_interval = self.normal_interval
+
+        self.copmaxModbusPoll.apply_options(
+            frame_delay=options.get(CONF_FRAME_DELAY, DEFAULT_FRAME_DELAY),
+            timeout=options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT),
+            retries=options.get(CONF_RETRIES, DEFAULT_RETRIES),
+            max_registers=options.get(CONF_MAX_REGISTERS),
+            group_intervals={
+                group: options.get(
+                    CONF_GROUP_INTERVAL.format(group), DEFAULT_GROUP_INTERVAL
+                )
+                for group in POLL_GROUPS
+            },
+            group_max_ages={
+                group: options.get(
+                    CONF_GROUP_MAX_AGE.format(group), DEFAULT_GROUP_MAX_AGE
+                )
+                for group in POLL_GROUPS
+            },
+        )
+
+    def _adapt_interval(self):
+        """Poll faster while any temperature is changing more than the threshold."""
+        poll = self.copmaxModbusPoll
+        if not self.fast_poll_threshold or not poll.updated_registers & set(
+            poll.temperatures
+        ):
+            return
+
+        temperatures = poll.temperatures
+        fast = self._last_temperatures is not None and any(
+            abs(value - self._last_temperatures.get(register, value)) / 100
+            > self.fast_poll_threshold
+            for register, value in temperatures.items()
+            if register in poll.updated_registers
+        )
+        self._last_temperatures = temperatures
+        self.update_interval = self.fast_interval if fast else self.normal_interval
+
+    def _update_history(self):
+        """Buffer the temperature samples and push completed hours as statistics."""
+        poll = self.copmaxModbusPoll
+        now = time.time()
+        self.history.add(
+            now,
+            {
+                register: value
+                for register, value in poll.temperatures.items()
+                if register in poll.updated_registers
+            },
+        )
+
+        hour = now - now % STATISTICS_PERIOD
+        if self._statistics_hour is None:
+            self._statistics_hour = hour
+        elif hour > self._statistics_hour:
+            self._push_statistics(self._statistics_hour)
+            self._statistics_hour = hour
+
+    def _push_statistics(self, start: float):
+        """Add min/mean/max of one period as external long-term statistics."""
+        if "recorder" not in self.hass.config.components or not self.statistics_names:
+            return
+
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        for register, (key, name) in self.statistics_names.items():
+            aggregate = self.history.aggregate(
+                register, start, start + STATISTICS_PERIOD
+            )
+            if aggregate is None:
+                continue
+
+            minimum, mean, maximum = aggregate
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"{self.alias} {name}",
+                source=DOMAIN,
+                statistic_id=f"{DOMAIN}:{slugify(f'{self.alias}_{key}')}",
+                unit_of_measurement="°C",
+            )
+            statistic = StatisticData(
+                start=dt_util.utc_from_timestamp(start),
+                min=minimum / 100,
+                mean=mean / 100,
+                max=maximum / 100,
+            )
+            async_add_external_statistics(self.hass, metadata, [statistic])
+
+    def window_aggregate(self, register: int):
+        """Return (min, mean, max) of the current statistics window, or None."""
+        return self.history.aggregate(register, time.time() - self.statistics_window)
+
+    def _update_derived(self):
+        """Feed the latest temperatures into the derived value calculator."""
+        poll = self.copmaxModbusPoll
+        if not (poll.is_fresh(0) and poll.is_fresh(1)):
+            return
+
+        self.derived.update(
+            dt_util.now(),
+            poll.temperatures[0] / 100,
+            poll.temperatures[1] / 100,
+            self._electric_power(),
+        )
+
+    def _electric_power(self) -> float | None:
+        """Read the external power sensor in W, if one is configured."""
+        if self.power_entity is None:
+            return None
+
+        state = self.hass.states.get(self.power_entity)
+        if state is None:
+            return None
+
+        try:
+            value = float(state.state)
+        except ValueError:
+            return None
+
+        if state.attributes.get("unit_of_measurement") == "kW":
+            value *= 1000
+        return value
@@ -0,0 +1,94 @@
+"""Per-request deadlines from the frame time and the observed round trips.
+
+A flat timeout has to cover the slowest request, so a lost answer to a short
+read costs seconds. The time a request needs is mostly known in advance: the
+request and response frames on the RS-485 bus, at 11 bits per character, plus
+the turnaround of the gateway and the controller. The turnaround is learned
+from the round trips of answered requests, and the deadline of a request is
+its frame time plus a multiple of a high percentile of the turnaround.
+
+A missed deadline doubles the deadlines until the next answer, so a link that
+got slower is not mistaken for a lost one for long. The configured timeout
+stays the upper limit, and is used until enough round trips were seen.
+"""
+
+from collections import deque
+import statistics
+
+from .const import (
+    DEADLINE_FACTOR,
+    DEADLINE_MIN_MARGIN,
+    DEADLINE_MIN_SAMPLES,
+    DEADLINE_PERCENTILE,
+    DEADLINE_SAMPLES,
+    HOLDING_REGISTER_CODE,
+    INPUT_REGISTER_CODE,
+    READ_WRITE_MULTIPLE_CODE,
+    WRITE_MULTIPLE_CODE,
+    WRITE_REGISTER_CODE,
+)
+
+CHARACTER_BITS = 11  # start, 8 data, parity or stop, stop
+
+
+def frame_bytes(function_code: int, count: int) -> int:
+    """Bytes of the RTU request and response together, address and CRC included."""
+    if function_code in (HOLDING_REGISTER_CODE, INPUT_REGISTER_CODE):
+        return 8 + 5 + 2 * count
+    if function_code == WRITE_REGISTER_CODE:
+        return 8 + 8
+    if function_code == WRITE_MULTIPLE_CODE:
+        return 9 + 2 * count + 8
+    if function_code == READ_WRITE_MULTIPLE_CODE:
+        # The same count read back as written
+        return 13 + 2 * count + 5 + 2 * count
+    raise ValueError(f"Unknown function code {function_code}")
+
+
+class RequestDeadline:
+    """Deadline of the next request, learned from the answered ones."""
+
+    def __init__(self, baudrate: int, timeout: float):
+        self.character_time = CHARACTER_BITS / baudrate
+        self.timeout = timeout
+        # Round trip minus frame time of answered requests
+        self._overheads = deque(maxlen=DEADLINE_SAMPLES)
+        self._overhead = None
+        self._misses = 0
+
+        # Statistics
+        self.missed = 0
+
+    def frame_time(self, function_code: int, count: int) -> float:
+        return frame_bytes(function_code, count) * self.character_time
+
+    def deadline(self, function_code: int, count: int) -> float:
+        """Seconds to wait for the answer to a request."""
+        if self._overhead is None:
+            return self.timeout
+        deadline = self.frame_time(function_code, count) + max(
+            DEADLINE_MIN_MARGIN, DEADLINE_FACTOR * self._overhead
+        )
+        return min(self.timeout, deadline * 2**self._misses)
+
+    def record(self, function_code: int, count: int, rtt: float):
+        """Learn from the round trip of an answered request."""
+        self._overheads.append(max(0.0, rtt - self.frame_time(function_code, count)))
+        self._misses = 0
+        if len(self._overheads) >= DEADLINE_MIN_SAMPLES:
+            self._overhead = statistics.quantiles(
+                self._overheads, n=100, method="inclusive"
+            )[DEADLINE_PERCENTILE - 1]
+
+    def record_miss(self):
+        """No answer within the deadline, be more patient with the next request."""
+        self._misses += 1
+        self.missed += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "samples": len(self._overheads),
+            "overhead": None if self._overhead is None else round(self._overhead, 4),
+            "read_deadline": round(self.deadline(INPUT_REGISTER_CODE, 6), 3),
+            "missed": self.missed,
+        }
@@ -0,0 +1,90 @@
+"""Derived thermal power, COP and energy computed from the polled registers."""
+
+from collections import deque
+from datetime import date, datetime
+
+from .const import COP_WINDOW, DERIVED_MAX_GAP, WATER_HEAT_CAPACITY
+
+
+class CopmaxDerivedValues:
+    """Incremental heat output, rolling COP and daily delivered energy.
+
+    Every sample is an O(1) update: the energy is integrated with the trapezoid
+    rule between consecutive polls, and the rolling COP is kept as two running
+    sums over a time window that is trimmed from the left as samples age out.
+    """
+
+    def __init__(self, flow_rate: float, cop_window: int = COP_WINDOW):
+        # Flow in l/min, water is close enough to 1 kg/l for this purpose
+        self._mass_flow = flow_rate / 60
+        self._cop_window = cop_window
+
+        self.heat_power = None  # W
+        self.electric_power = None  # W
+        self.cop = None
+        self.energy_today = 0.0  # kWh
+
+        self._day = None
+        self._last_time = None
+        self._last_heat = None
+        self._last_electric = None
+
+        # (duration, heat J, electric J) per integrated interval
+        self._window = deque()
+        self._window_duration = 0.0
+        self._window_heat = 0.0
+        self._window_electric = 0.0
+
+    def update(
+        self,
+        now: datetime,
+        return_temp: float,
+        output_temp: float,
+        electric_power: float | None = None,
+    ):
+        """Add one sample, temperatures in degC and power in W."""
+        heat = max(0.0, self._mass_flow * WATER_HEAT_CAPACITY * (output_temp - return_temp))
+
+        if self._day != now.date():
+            self._day = now.date()
+            self.energy_today = 0.0
+
+        if self._last_time is not None:
+            duration = (now - self._last_time).total_seconds()
+            if 0 < duration <= DERIVED_MAX_GAP:
+                heat_joule = (heat + self._last_heat) / 2 * duration
+                self.energy_today += heat_joule / 3600000
+
+                if electric_power is not None and self._last_electric is not None:
+                    electric_joule = (electric_power + self._last_electric) / 2 * duration
+                    self._add_to_window(duration, heat_joule, electric_joule)
+
+        self._last_time = now
+        self._last_heat = heat
+        self._last_electric = electric_power
+
+        self.heat_power = round(heat)
+        self.electric_power = electric_power
+        if self._window_electric > 0:
+            self.cop = round(self._window_heat / self._window_electric, 2)
+        else:
+            self.cop = None
+
+    def restore_energy(self, day: date, energy: float):
+        """Continue the energy of an earlier run, if it is from the same day."""
+        if self._day not in (None, day):
+            return
+        self._day = day
+        self.energy_today += energy
+
+    def _add_to_window(self, duration, heat_joule, electric_joule):
+        self._window.append((duration, heat_joule, electric_joule))
+        self._window_duration += duration
+        self._window_heat += heat_joule
+        self._window_electric += electric_joule
+
+        while self._window_duration > self._cop_window and len(self._window) > 1:
+            old_duration, old_heat, old_electric = self._window.popleft()
+            self._window_duration -= old_duration
+            self._window_heat -= old_heat
+            self._window_electric -= old_electric
@@ -0,0 +1,48 @@
+"""Diagnostics support for the Copmax integration."""
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]._coordinator
+    poll = coordinator.copmaxModbusPoll
+
+    return {
+        "data": dict(entry.data),
+        "options": dict(entry.options),
+        "breaker": poll.breaker.as_dict(),
+        "deadline": poll.deadline.as_dict(),
+        "register_failures": {
+            str(address): failures
+            for (_, address), failures in poll.register_failures.items()
+        },
+        "excluded_registers": [address for (_, address) in poll.excluded_registers],
+        "suppressed_updates": coordinator.suppressed_updates,
+        "fleet": coordinator.scheduler.as_dict(),
+        "discovery": (
+            coordinator.discovery.summary() if coordinator.discovery else None
+        ),
+        "proxy": coordinator.proxy.as_dict() if coordinator.proxy else None,
+        "register_log": (
+            {
+                "path": coordinator.register_log.path,
+                "capacity": coordinator.register_log.capacity,
+                "records": coordinator.register_log.count,
+            }
+            if coordinator.register_log
+            else None
+        ),
+        "schedule": {
+            "slots": len(coordinator.schedule.slots),
+            "next_start": coordinator.schedule.next_start(dt_util.now()),
+            "writes": coordinator.schedule_writes,
+            "skips": coordinator.schedule_skips,
+        },
+    }
@@ -0,0 +1,93 @@
+"""Discovery of registers outside of the register map."""
+
+from collections import deque
+import time
+
+from .const import DISCOVERY_ADDRESSES, POLL_GROUPS
+
+PROBE_READABLE = "readable"
+PROBE_EXCEPTION = "exception"
+PROBE_TIMEOUT = "timeout"
+
+
+class CopmaxDiscovery:
+    """Probe unknown addresses one register at a time.
+
+    Addresses that were never probed go first. After that the readable ones
+    are read again in turn, to see which of them change and how much. The
+    results are plain dicts keyed by "<register code>:<address>", as saved in
+    the Store.
+    """
+
+    def __init__(self, results: dict | None = None):
+        self.results: dict[str, dict] = results or {}
+
+        known = {
+            (code, address)
+            for code, first, count, _ in POLL_GROUPS.values()
+            for address in range(first, first + count)
+        }
+        codes = sorted({code for code, *_ in POLL_GROUPS.values()}, reverse=True)
+        self._unprobed = deque(
+            (code, address)
+            for code in codes
+            for address in DISCOVERY_ADDRESSES
+            if (code, address) not in known
+            and self._key(code, address) not in self.results
+        )
+        self._resample = deque()
+
+    @staticmethod
+    def _key(code: int, address: int) -> str:
+        return f"{code}:{address}"
+
+    def next_target(self) -> tuple[int, int] | None:
+        """Register code and address to probe next, None if nothing is readable."""
+        if self._unprobed:
+            return self._unprobed.popleft()
+
+        if not self._resample:
+            self._resample.extend(
+                tuple(int(part) for part in key.split(":"))
+                for key, result in self.results.items()
+                if result["status"] == PROBE_READABLE
+            )
+        return self._resample.popleft() if self._resample else None
+
+    def record(self, code: int, address: int, status: str, value: int | None):
+        """Add the outcome of a probe, keeping a running mean and variance."""
+        result = self.results.setdefault(
+            self._key(code, address),
+            {"samples": 0, "min": None, "max": None, "mean": 0.0, "m2": 0.0},
+        )
+        result["status"] = status
+        result["probed_at"] = time.time()
+        if status != PROBE_READABLE:
+            result["value"] = value  # exception code or None
+            return
+
+        # Welford's online algorithm
+        result["samples"] += 1
+        delta = value - result["mean"]
+        result["mean"] += delta / result["samples"]
+        result["m2"] += delta * (value - result["mean"])
+        result["min"] = value if result["min"] is None else min(result["min"], value)
+        result["max"] = value if result["max"] is None else max(result["max"], value)
+        result["value"] = value
+
+    def summary(self) -> dict:
+        """Counts per status and the readable registers with their spread."""
+        counts = {PROBE_READABLE: 0, PROBE_EXCEPTION: 0, PROBE_TIMEOUT: 0}
+        readable = {}
+        for key, result in self.results.items():
+            counts[result["status"]] += 1
+            if result["status"] == PROBE_READABLE:
+                samples = result["samples"]
+                readable[key] = {
+                    "value": result["value"],
+                    "min": result["min"],
+                    "max": result["max"],
+                    "variance": result["m2"] / samples if samples else 0.0,
+                    "samples": samples,
+                }
+        return counts | {"unprobed": len(self._unprobed), "registers": readable}
@@ -0,0 +1,72 @@
+"""Base entity for the CustomIntegration platforms."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import CopmaxCoordinator
+
+
+@dataclass(frozen=True, kw_only=True)
+class CopmaxEntityDescription(EntityDescription):
+    """Fields shared by the descriptions of all platforms."""
+
+    register: int | str
+    kind: str
+    value: Callable | None = None
+    # Further registers the value is taken from
+    registers: tuple[int, ...] = ()
+
+
+class CopmaxEntity(CoordinatorEntity[CopmaxCoordinator]):
+    """Entity showing one register of the coordinator snapshot.
+
+    The register is the coordinator context, so the entity is only called back
+    when its register was read or went stale. An entity over several registers
+    has all of them as context and is available while all of them are fresh.
+    """
+
+    entity_description: CopmaxEntityDescription
+    _attr_should_poll = False
+    _unrecorded_attributes = frozenset({"age_seconds"})
+
+    def __init__(
+        self, coordinator: CopmaxCoordinator, description: CopmaxEntityDescription
+    ):
+        self._registers = (description.register, *description.registers)
+        context = description.register
+        if description.registers:
+            context = frozenset(self._registers)
+        super().__init__(coordinator, context)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.alias}_{description.key}"
+        self._attr_name = f"{coordinator.alias} {description.name}"
+        self._attr_device_info = coordinator.device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the coordinator and show the current snapshot."""
+        await super().async_added_to_hass()
+        self._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        """Availability follows the age of the register, not the last poll."""
+        data = self.coordinator.data
+        return data is not None and all(map(data.is_fresh, self._registers))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Take the value of the register from the new snapshot."""
+        data = self.coordinator.data
+        if data is not None and all(map(data.is_fresh, self._registers)):
+            self._set_value(self.entity_description.value(data))
+            self._attr_extra_state_attributes = {
+                "age_seconds": round(data.age(self.entity_description.register))
+            }
+        self.async_write_ha_state()
+
+    def _set_value(self, value) -> None:
+        self._attr_native_value = value
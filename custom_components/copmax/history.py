@@ -0,0 +1,36 @@
+"""Ring buffer of raw register samples used for downsampling and statistics."""
+
+from collections import deque
+
+
+class CopmaxRegisterHistory:
+    """Keeps the raw samples of a set of registers between state writes.
+
+    Each register has its own fixed-size deque of (timestamp, value) pairs, so
+    memory use is bounded no matter how long the integration runs.
+    """
+
+    def __init__(self, registers, maxlen: int):
+        self._samples = {register: deque(maxlen=maxlen) for register in registers}
+
+    def add(self, timestamp: float, values: dict):
+        """Append one sample for every tracked register present in values."""
+        for register, samples in self._samples.items():
+            if register in values:
+                samples.append((timestamp, values[register]))
+
+    def aggregate(self, register, start: float, end: float | None = None):
+        """Return (min, mean, max) of the samples in [start, end), or None."""
+        values = [
+            value
+            for timestamp, value in self._samples[register]
+            if timestamp >= start and (end is None or timestamp < end)
+        ]
+        if not values:
+            return None
+
+        return min(values), sum(values) / len(values), max(values)
+
+    @property
+    def registers(self):
+        return self._samples.keys()
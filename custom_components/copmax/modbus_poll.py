@@ -2,226 +2,590 @@ import asyncio
 from logging import getLogger
 import time
 
-from .const import HOLDING_REGISTER_CODE, INPUT_REGISTER_CODE
-from pymodbus.client import AsyncModbusTcpClient
-from pymodbus.exceptions import ModbusException
+from .breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from .capture import CaptureRecorder, CaptureWriter
+from .const import (
+    BAD_REGISTER_LIMIT,
+    BAD_REGISTER_RETRY,
+    BISECT_BUDGET,
+    DEFAULT_BAUDRATE,
+    DEFAULT_FRAME_DELAY,
+    DEFAULT_GROUP_INTERVAL,
+    DEFAULT_GROUP_MAX_AGE,
+    DEFAULT_MAX_REGISTERS,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    HOLDING_REGISTER_CODE,
+    INPUT_REGISTER_CODE,
+    MAX_WRITE,
+    POLL_GROUPS,
+    PROFILE_FRAME_DELAYS,
+    PROFILE_READ_SIZES,
+    PROFILE_SAMPLES,
+    READ_WRITE_MULTIPLE_CODE,
+    TRANSPORT_TCP,
+    WRITE_MULTIPLE_CODE,
+    WRITE_REGISTER_CODE,
+)
+from .deadline import RequestDeadline
+from .discovery import PROBE_EXCEPTION, PROBE_READABLE, PROBE_TIMEOUT
+from .snapshot import CopmaxSnapshot
+from .transport import create_client
 
 _LOGGER = getLogger(__name__)
 
 
+def _spans() -> dict[int, tuple[int, int]]:
+    """Register code -> first address and count of its contiguous mapped range."""
+    spans = {}
+    for register_code, start, count, _ in sorted(
+        POLL_GROUPS.values(), key=lambda group: group[1]
+    ):
+        first, length = spans.get(register_code, (start, 0))
+        if first + length == start:
+            spans[register_code] = (first, length + count)
+    return spans
+
+
+# Exception codes of a request that was understood: illegal data address and
+# illegal data value
+INVALID_REQUEST_CODES = (0x02, 0x03)
+
+
 class CopmaxModbusPoll:
-    def __init__(self, host, port):
+    def __init__(
+        self, host, port, transport=TRANSPORT_TCP, baudrate=DEFAULT_BAUDRATE, client=None
+    ):
         self._lock = asyncio.Lock()
         self._host = host
         self._port = port
+        self._transport = transport
+        self._baudrate = baudrate
         self._errorcount = 0
-        self._client = AsyncModbusTcpClient(self._host, port=self._port, timeout=3)
-
-        self.temperatures_valid = False
-        self.temperatures_timestamp = time.time()
-        self.temperatures = []
 
-        self.user_settings_valid = False
-        self.user_settings_timestamp = time.time()
-        self.user_settings = []
-
-        self.status_valid = False
-        self.status_timestamp = time.time()
-        self.status = []
-
-        self.special_functions_valid = False
-        self.special_functions_timestamp = time.time()
-        self.special_functions = []
-
-    async def poll_heat_pump_data(self):
+        # Bus pacing and batching, see apply_options
+        self.frame_delay = DEFAULT_FRAME_DELAY
+        self.timeout = DEFAULT_TIMEOUT
+        self.retries = DEFAULT_RETRIES
+        self.max_registers = None
+        self.group_intervals = {group: DEFAULT_GROUP_INTERVAL for group in POLL_GROUPS}
+        self._group_polled_at = {group: 0.0 for group in POLL_GROUPS}
+        self.group_max_ages = {group: DEFAULT_GROUP_MAX_AGE for group in POLL_GROUPS}
+
+        # Time each register was last read, and the registers read in the
+        # latest poll. Input and holding addresses do not overlap, so the
+        # address alone is the key.
+        self.register_timestamps = {}
+        self.updated_registers = set()
+        self._register_groups = {
+            address: group
+            for group, (_, start, count, _) in POLL_GROUPS.items()
+            for address in range(start, start + count)
+        }
+
+        # (register code, address) -> failed single reads, and the registers
+        # left out of merged reads with the time they were last tried
+        self.register_failures = {}
+        self.excluded_registers = {}
+
+        # A client given here, like a ReplayClient, is used instead of one for
+        # the transport. Requests are recorded while a capture is running.
+        self._given_client = client
+        self.capture: CaptureWriter | None = None
+        self._client = self._create_client()
+        self.breaker = CircuitBreaker()
+        self.deadline = RequestDeadline(baudrate, self.timeout)
+
+        # Request shapes the heat pump and gateway support, see
+        # probe_capabilities. Until known, reads are limited as set by
+        # apply_options and writes go out one register at a time.
+        self.max_reads = {}
+        self.write_multiple = False
+        self.read_write_multiple = False
+
+        self.temperatures = {}
+        self.user_settings = {}
+        self.status = {}
+        self.special_functions = {}
+
+    def _create_client(self):
+        client = self._given_client or create_client(
+            self._transport, self._host, self._port, self.timeout, self._baudrate
+        )
+        if self.capture is not None:
+            client = CaptureRecorder(client, self.capture)
+        return client
+
+    def start_capture(self, writer: CaptureWriter):
+        """Record all requests to the capture, from the next request on."""
+        self.capture = writer
+        self._client.close()
+        self._client = self._create_client()
+
+    def stop_capture(self) -> CaptureWriter | None:
+        """Stop recording, return the capture for the caller to close."""
+        writer, self.capture = self.capture, None
+        self._client.close()
+        self._client = self._create_client()
+        return writer
+
+    def apply_options(
+        self,
+        frame_delay: float,
+        timeout: float,
+        retries: int,
+        max_registers: int | None,
+        group_intervals: dict,
+        group_max_ages: dict,
+    ):
+        """Change pacing and batching on the running poller.
+
+        Call it between polls: a new timeout replaces the client. Without
+        max_registers the reads are as long as the heat pump answers.
+        """
+        self.frame_delay = frame_delay
+        self.retries = retries
+        self.max_registers = None if max_registers is None else max(1, max_registers)
+        self.group_intervals |= group_intervals
+        self.group_max_ages |= group_max_ages
+
+        if timeout != self.timeout:
+            # The client timeout is fixed at creation, so swap the client
+            self.timeout = timeout
+            self.deadline.timeout = timeout
+            self._client.close()
+            self._client = self._create_client()
+
+    def apply_capabilities(self, capabilities: dict):
+        """Use the request shapes of a capability profile."""
+        self.max_reads = {
+            int(register_code): count
+            for register_code, count in capabilities.get("max_read", {}).items()
+            if count
+        }
+        self.write_multiple = capabilities.get("write_multiple", False)
+        self.read_write_multiple = capabilities.get("read_write_multiple", False)
+
+    async def probe_capabilities(self) -> dict:
+        """Find the request shapes the heat pump and gateway support.
+
+        Per register code, the longest read from the start of the mapped
+        registers that still answers. Write multiple and read/write multiple
+        are sent without registers to write, a request the heat pump has to
+        reject, see _probe_function, so no setting is written. Raises
+        ConnectionError if the heat pump does not answer at all.
+        """
+        spans = _spans()
         try:
-            await self._poll_temperatures()
-            await self._poll_user_settings()
-            await self._poll_status_registers()
-            await self._poll_special_functions()
+            max_read = {}
+            for register_code, (start, count) in spans.items():
+                max_read[str(register_code)] = await self._probe_max_read(
+                    register_code, start, count
+                )
+            if not any(max_read.values()):
+                raise ConnectionError(f"{self._host}:{self._port} - no response")
+
+            start = spans[HOLDING_REGISTER_CODE][0]
+            # Both with a write quantity of 0, which the heat pump has to
+            # reject before writing anything, see transport.py for FC23
+            write_multiple = await self._probe_function(
+                lambda: self._client.write_registers(start, [])
+            )
+            read_write_multiple = await self._probe_function(
+                lambda: self._client.readwrite_registers(
+                    read_address=start,
+                    read_count=1,
+                    write_address=start,
+                    values=[],
+                )
+            )
+        finally:
             self._client.close()
-            return True
-        except Exception as e:
-            _LOGGER.error(f"Error PollHeatPumpData: {e}")
-            return False
-
-    async def _poll_temperatures(self):
-        register_start = 0
-        no_of_registers = 6
 
-        _LOGGER.debug(f"Poll temperatures {register_start}:{no_of_registers}")
-
-        temp = await self._modbus_poll_registers(
-            INPUT_REGISTER_CODE, register_start, no_of_registers
+        capabilities = {
+            "max_read": max_read,
+            "write_multiple": write_multiple,
+            "read_write_multiple": read_write_multiple,
+        }
+        _LOGGER.info(f"{self._host}:{self._port} - capabilities {capabilities}")
+        return capabilities
+
+    async def _probe_max_read(self, register_code: int, start: int, count: int) -> int:
+        """Longest read of at most count registers from start, 0 if none works."""
+        if register_code == INPUT_REGISTER_CODE:
+            read = self._client.read_input_registers
+        else:
+            read = self._client.read_holding_registers
+
+        async def answers(length: int) -> bool:
+            status, values = await self._probe_request(
+                lambda: read(start, count=length)
+            )
+            return status == PROBE_READABLE and len(values) == length
+
+        if not await answers(1):
+            return 0
+        if await answers(count):
+            return count
+
+        # Bisect between a length that answers and one that does not
+        low, high = 1, count
+        while high - low > 1:
+            middle = (low + high) // 2
+            if await answers(middle):
+                low = middle
+            else:
+                high = middle
+        return low
+
+    async def _probe_function(self, request) -> bool:
+        """Check if the heat pump implements the function of an invalid request.
+
+        Illegal data address or value means the request was understood and
+        rejected, illegal function or no answer that it was not.
+        """
+        status, code = await self._probe_request(request)
+        return status == PROBE_READABLE or (
+            status == PROBE_EXCEPTION and code in INVALID_REQUEST_CODES
         )
-        if len(temp) == no_of_registers:
-            temp2dict = [self.convert_16bit_to_signed(tmp) for tmp in temp]
-            self.temperatures = dict(enumerate(temp2dict, start=register_start))
 
-            self.temperatures_valid = True
-            self.temperatures_timestamp = time.time()
-            _LOGGER.debug(f"Heat pump temperatures {self.temperatures}")
-        elif (
-            self.temperatures_timestamp + 300
-        ) < time.time() or not self.temperatures_valid:
-            self.temperatures_valid = False
-            _LOGGER.error(f"Invalid temperature data: {temp}")
+    async def _probe_request(self, request) -> tuple[str, list | int | None]:
+        """Send request() with the flat timeout and classify the answer.
 
-    async def _poll_user_settings(self):
-        register_start = 38
-        no_of_registers = 6
+        Returns the status and the registers, or the exception code for an
+        exception response. Not counted by the circuit breaker or deadlines.
+        """
+        from pymodbus.exceptions import ModbusException
 
-        _LOGGER.debug(f"Poll user_Settings {register_start}:{no_of_registers}")
+        try:
+            if not self._client.connected:
+                await self._client.connect()
+            await asyncio.sleep(self.frame_delay)
+            resp = await request()
+        except (ModbusException, OSError, asyncio.TimeoutError) as ex:
+            _LOGGER.debug(f"Probe got no answer: {ex!s}")
+            return PROBE_TIMEOUT, None
+
+        if resp.isError():
+            return PROBE_EXCEPTION, getattr(resp, "exception_code", None)
+        return PROBE_READABLE, list(resp.registers)
+
+    async def profile_link(self) -> dict:
+        """Time reads of different sizes and recommend pacing for this link.
+
+        The read sizes that work are found at the safe default delay first,
+        then the smallest delay where all of them still succeed is searched.
+        Raises ConnectionError if the heat pump does not answer at all.
+        """
+        frame_delay = self.frame_delay
+        try:
+            self.frame_delay = DEFAULT_FRAME_DELAY
+            timings = await self._profile_reads(PROFILE_READ_SIZES)
+            sizes = [size for size, rtt in timings.items() if rtt is not None]
+            if not sizes:
+                raise ConnectionError(f"{self._host}:{self._port} - no response")
+
+            for delay in PROFILE_FRAME_DELAYS:
+                self.frame_delay = delay
+                paced = await self._profile_reads(sizes)
+                if None not in paced.values():
+                    timings = paced
+                    break
+        finally:
+            self.frame_delay = frame_delay
+            self._client.close()
 
-        temp = await self._modbus_poll_registers(
-            HOLDING_REGISTER_CODE, register_start, no_of_registers
+        slowest = max(rtt for rtt in timings.values() if rtt is not None)
+        profile = {
+            "frame_delay": delay,
+            "timeout": round(min(DEFAULT_TIMEOUT, max(0.5, 3 * slowest)), 2),
+            "max_registers": max(sizes),
+            "rtt": {
+                str(size): round(rtt, 3)
+                for size, rtt in timings.items()
+                if rtt is not None
+            },
+        }
+        _LOGGER.info(f"{self._host}:{self._port} - link profile {profile}")
+        return profile
+
+    async def _profile_reads(self, sizes) -> dict:
+        """Return the slowest round trip per read size, None if a read failed."""
+        timings = {}
+        for size in sizes:
+            timings[size] = 0.0
+            for _ in range(PROFILE_SAMPLES):
+                started = time.perf_counter()
+                registers = await self._modbus_read_registers(
+                    INPUT_REGISTER_CODE, 0, size
+                )
+                elapsed = time.perf_counter() - started - self.frame_delay
+                if len(registers) != size:
+                    timings[size] = None
+                    break
+                timings[size] = max(timings[size], elapsed)
+
+            if timings[size] is None and not self._client.connected:
+                # No point in trying bigger reads without a connection
+                break
+
+        return timings
+
+    def register_age(self, address: int) -> float | None:
+        """Seconds since the register was last read, None if it never was."""
+        timestamp = self.register_timestamps.get(address)
+        if timestamp is None:
+            return None
+        return time.time() - timestamp
+
+    def is_fresh(self, address: int) -> bool:
+        """Check if the register was read within the max age of its group."""
+        age = self.register_age(address)
+        return age is not None and age <= self.group_max_ages[self._register_groups[address]]
+
+    def snapshot(
+        self, previous: CopmaxSnapshot | None = None, derived: dict | None = None
+    ) -> CopmaxSnapshot:
+        """Copy the register image into an immutable snapshot."""
+        registers = (
+            self.temperatures | self.status | self.special_functions | self.user_settings
         )
-        if len(temp) == no_of_registers:
-            temp2dict = [self.convert_16bit_to_signed(tmp) for tmp in temp]
-            self.user_settings = dict(enumerate(temp2dict, start=register_start))
-
-            self.user_settings_valid = True
-            self.user_settings_timestamp = time.time()
-            _LOGGER.debug(f"Heat pump user_settings {self.user_settings}")
-        elif (
-            self.user_settings_timestamp + 300
-        ) < time.time() or not self.user_settings_valid:
-            self.user_settings_valid = False
-            _LOGGER.error(f"Invalid user settings data: {temp}")
-
-        if self.user_settings_valid:
-            register_start = 44
-            no_of_registers = 6
-
-            _LOGGER.debug(f"Poll user_Settings {register_start}:{no_of_registers}")
-
-            temp = await self._modbus_poll_registers(
-                HOLDING_REGISTER_CODE, register_start, no_of_registers
-            )
-            if len(temp) == no_of_registers:
-                temp2dict = [self.convert_16bit_to_signed(tmp) for tmp in temp]
-                self.user_settings |= dict(enumerate(temp2dict, start=register_start))
-
-                self.user_settings_valid = True
-                self.user_settings_timestamp = time.time()
-                # _LOGGER.debug(f"Heat pump user_settings {self.user_settings}")
-            elif (
-                self.user_settings_timestamp + 300
-            ) < time.time() or not self.user_settings_valid:
-                self.user_settings_valid = False
-                _LOGGER.error(f"Invalid user settings data: {temp}")
-
-        if self.user_settings_valid:
-            self.user_settings_valid = False
-            register_start = 50
-            no_of_registers = 7
-
-            _LOGGER.debug(f"Poll user_Settings {register_start}:{no_of_registers}")
-
-            temp = await self._modbus_poll_registers(
-                HOLDING_REGISTER_CODE, register_start, no_of_registers
-            )
-            if len(temp) == no_of_registers:
-                temp2dict = [self.convert_16bit_to_signed(tmp) for tmp in temp]
-                self.user_settings |= dict(enumerate(temp2dict, start=register_start))
-
-                self.user_settings_valid = True
-                self.user_settings_timestamp = time.time()
-                _LOGGER.debug(f"Heat pump user_settings {self.user_settings}")
-            elif (
-                self.user_settings_timestamp + 300
-            ) < time.time() or not self.user_settings_valid:
-                _LOGGER.error(f"Invalid user settings data: {temp}")
-
-    async def _poll_status_registers(self):
-        register_start = 6
-        no_of_registers = 7
-
-        _LOGGER.debug(f"Poll status_registers {register_start}:{no_of_registers}")
-
-        temp = await self._modbus_poll_registers(
-            INPUT_REGISTER_CODE, register_start, no_of_registers
+        if previous is None:
+            changed = registers.keys()
+        else:
+            changed = [
+                address
+                for address, value in registers.items()
+                if previous.registers.get(address) != value
+            ]
+
+        return CopmaxSnapshot(
+            registers,
+            dict(self.register_timestamps),
+            self.updated_registers,
+            changed,
+            derived or {},
+            {
+                address: self.group_max_ages[group]
+                for address, group in self._register_groups.items()
+            },
         )
-        if len(temp) == no_of_registers:
-            temp2dict = temp
-            self.status = dict(enumerate(temp2dict, start=register_start))
 
-            self.status_valid = True
-            self.status_timestamp = time.time()
-            # _LOGGER.debug(f"Heat pump status {self.status}")
-        elif (self.status_timestamp + 300) < time.time() or not self.status_valid:
-            self.status_valid = False
-            _LOGGER.error(f"Invalid status data: {temp}")
-
-        if self.status_valid:
-            self.status_valid = False
-            register_start = 13
-            no_of_registers = 8
+    async def poll_heat_pump_data(self):
+        """Poll the groups that are due.
+
+        Raises CircuitOpenError without touching the bus while the heat pump
+        is considered offline.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(
+                f"{self._host}:{self._port} - offline, next try in "
+                f"{self.breaker.retry_at - time.time():.0f}s"
+            )
 
-            _LOGGER.debug(f"Poll status_registers {register_start}:{no_of_registers}")
+        if self.breaker.state == STATE_HALF_OPEN:
+            # A single register decides if a full poll is worth it
+            probe = await self._modbus_read_registers(INPUT_REGISTER_CODE, 0, 1)
+            if not probe:
+                self._client.close()
+                self.breaker.record_failure()
+                raise CircuitOpenError(
+                    f"{self._host}:{self._port} - still offline, next try in "
+                    f"{self.breaker.backoff:.0f}s"
+                )
 
-            temp = await self._modbus_poll_registers(
-                INPUT_REGISTER_CODE, register_start, no_of_registers
-            )
-            if len(temp) == no_of_registers:
-                temp2dict = temp
-                self.status |= dict(enumerate(temp2dict, start=register_start))
+        polled = False
+        try:
+            self.updated_registers = set()
+            now = time.time()
+            for group in POLL_GROUPS:
+                if now - self._group_polled_at[group] >= self.group_intervals[group]:
+                    polled = True
+                    await self._poll_group(group)
+                    self._group_polled_at[group] = now
+                    if not self.updated_registers and not self._client.connected:
+                        # No connection at all, the other groups would fail too
+                        break
+            self._client.close()
+        except Exception as e:
+            _LOGGER.error(f"Error PollHeatPumpData: {e}")
 
-                self.status_valid = True
-                self.status_timestamp = time.time()
-                _LOGGER.debug(f"Heat pump status {self.status}")
-            elif (self.status_timestamp + 300) < time.time() or not self.status_valid:
-                _LOGGER.error(f"Invalid status data: {temp}")
+        if not polled:
+            return True
 
-    async def _poll_special_functions(self):
-        register_start = 24
-        no_of_registers = 6
+        if self.updated_registers:
+            if self.breaker.state != STATE_CLOSED:
+                _LOGGER.info(f"{self._host}:{self._port} - answering again")
+            self.breaker.record_success()
+            return True
 
-        _LOGGER.debug(f"Poll special_functions {register_start}:{no_of_registers}")
+        self.breaker.record_failure()
+        if self.breaker.state == STATE_OPEN:
+            _LOGGER.warning(
+                f"{self._host}:{self._port} - not answering, pausing polls for "
+                f"{self.breaker.backoff:.0f}s"
+            )
+        return False
+
+    def _blocks(self, register_code: int, register_start: int, no_of_registers: int):
+        """Split a register range into near-equal reads.
+
+        As long as the longest read the heat pump answers when probed, at most
+        max_registers if set. Unprobed, max_registers or DEFAULT_MAX_REGISTERS.
+        """
+        probed = self.max_reads.get(register_code)
+        limit = self.max_registers or probed or DEFAULT_MAX_REGISTERS
+        if probed:
+            limit = min(limit, probed)
+        no_of_blocks = -(-no_of_registers // limit)
+        size, extra = divmod(no_of_registers, no_of_blocks)
+        for block in range(no_of_blocks):
+            count = size + (1 if block < extra else 0)
+            yield register_start, count
+            register_start += count
+
+    def _plan(self, register_code: int, group_start: int, group_count: int):
+        """Split a group into reads, leaving out the excluded registers.
+
+        An excluded register is read on its own once per BAD_REGISTER_RETRY,
+        so it comes back if the failure was temporary.
+        """
+        now = time.time()
+        group_end = group_start + group_count
+        run_start = None
+        for address in range(group_start, group_end + 1):
+            excluded = (register_code, address) in self.excluded_registers
+            if address == group_end or excluded:
+                if run_start is not None:
+                    yield from self._blocks(
+                        register_code, run_start, address - run_start
+                    )
+                    run_start = None
+                if excluded and (
+                    now - self.excluded_registers[(register_code, address)]
+                    >= BAD_REGISTER_RETRY
+                ):
+                    self.excluded_registers[(register_code, address)] = now
+                    yield address, 1
+            elif run_start is None:
+                run_start = address
+
+    async def _read_salvage(
+        self, register_code: int, register_start: int, no_of_registers: int, budget: int
+    ):
+        """Read a range, bisecting a failed read to keep the registers that answer.
 
+        Returns the registers read and the remaining request budget.
+        """
         temp = await self._modbus_poll_registers(
-            HOLDING_REGISTER_CODE, register_start, no_of_registers
+            register_code, register_start, no_of_registers
         )
         if len(temp) == no_of_registers:
-            temp2dict = [self.convert_16bit_to_signed(tmp) for tmp in temp]
-            self.special_functions = dict(enumerate(temp2dict, start=register_start))
-
-            self.special_functions_valid = True
-            self.special_functions_timestamp = time.time()
-            _LOGGER.debug(f"Heat pump special_functions {self.special_functions}")
-        elif (
-            self.special_functions_timestamp + 300
-        ) < time.time() or not self.user_settings_valid:
-            self.special_functions_valid = False
-            _LOGGER.error(f"Invalid special_functions data: {temp}")
-
-        if self.special_functions_valid:
-            self.special_functions_valid = False
-            register_start = 30
-            no_of_registers = 8
-
-            _LOGGER.debug(f"Poll special_functions {register_start}:{no_of_registers}")
-
-            temp = await self._modbus_poll_registers(
-                HOLDING_REGISTER_CODE, register_start, no_of_registers
+            # Any read that answers ends a run of failures, so occasional
+            # glitches do not add up until a healthy register is excluded
+            if self.register_failures:
+                for address in range(register_start, register_start + no_of_registers):
+                    self._register_succeeded(register_code, address)
+            return dict(enumerate(temp, start=register_start)), budget
+
+        if no_of_registers == 1:
+            self._register_failed(register_code, register_start)
+            return {}, budget
+
+        if budget < 2 or not self._client.connected:
+            return {}, budget
+
+        _LOGGER.debug(f"Bisecting failed read {register_start}:{no_of_registers}")
+        half = no_of_registers // 2
+        values, budget = await self._read_salvage(
+            register_code, register_start, half, budget - 2
+        )
+        upper, budget = await self._read_salvage(
+            register_code, register_start + half, no_of_registers - half, budget
+        )
+        return values | upper, budget
+
+    def _register_failed(self, register_code: int, address: int):
+        failures = self.register_failures.get((register_code, address), 0) + 1
+        self.register_failures[(register_code, address)] = failures
+        if (
+            failures >= BAD_REGISTER_LIMIT
+            and (register_code, address) not in self.excluded_registers
+        ):
+            _LOGGER.warning(f"Register {address} keeps failing, excluded from reads")
+            self.excluded_registers[(register_code, address)] = time.time()
+
+    def _register_succeeded(self, register_code: int, address: int):
+        self.register_failures.pop((register_code, address), None)
+        if self.excluded_registers.pop((register_code, address), None) is not None:
+            _LOGGER.info(f"Register {address} answers again")
+
+    async def _poll_group(self, group: str):
+        register_code, group_start, group_count, signed = POLL_GROUPS[group]
+        values = {}
+
+        for register_start, no_of_registers in self._plan(
+            register_code, group_start, group_count
+        ):
+            _LOGGER.debug(f"Poll {group} {register_start}:{no_of_registers}")
+
+            temp, _ = await self._read_salvage(
+                register_code, register_start, no_of_registers, BISECT_BUDGET
             )
-            if len(temp) == no_of_registers:
-                temp2dict = [self.convert_16bit_to_signed(tmp) for tmp in temp]
-                self.special_functions |= dict(
-                    enumerate(temp2dict, start=register_start)
-                )
-
-                self.special_functions_valid = True
-                self.special_functions_timestamp = time.time()
-                _LOGGER.debug(f"Heat pump special_functions {self.special_functions}")
-            elif (
-                self.special_functions_timestamp + 300
-            ) < time.time() or not self.special_functions_valid:
-                _LOGGER.error(f"Invalid special_functions data: {temp}")
+            if not temp and not self._client.connected:
+                break
+            values |= temp
+
+        if signed:
+            values = {
+                register: self.convert_16bit_to_signed(value)
+                for register, value in values.items()
+            }
+
+        # Registers that failed this time keep their previous value and age
+        setattr(self, group, getattr(self, group) | values)
+        now = time.time()
+        for address in values:
+            self.register_timestamps[address] = now
+        self.updated_registers.update(values)
+
+        missing = [
+            address
+            for address in range(group_start, group_start + group_count)
+            if address not in values
+            and (register_code, address) not in self.excluded_registers
+        ]
+        if missing:
+            _LOGGER.debug(f"Heat pump {group} not read: {missing}")
+        else:
+            _LOGGER.debug(f"Heat pump {group} {values}")
 
     async def _modbus_poll_registers(
         self, register_code: hex, start_addr: int, count_num: int, slave_addr: int = 1
     ):
+        for attempt in range(self.retries + 1):
+            if attempt:
+                _LOGGER.debug(f"Retry {attempt} of {start_addr}:{count_num}")
+            registers = await self._modbus_read_registers(
+                register_code, start_addr, count_num, slave_addr
+            )
+            if registers:
+                return registers
+
+        return []
+
+    async def _modbus_read_registers(
+        self, register_code: hex, start_addr: int, count_num: int, slave_addr: int = 1
+    ):
+        # Already loaded with the client, see transport.py
+        from pymodbus.exceptions import ModbusException
+
         try:
             _LOGGER.debug(f"Modbus request:")
             if not self._client.connected:
@@ -230,7 +594,7 @@ class CopmaxModbusPoll:
             else:
                 _LOGGER.debug(f"Already connected.")
 
-            await asyncio.sleep(0.7)
+            await asyncio.sleep(self.frame_delay)
 
             if self._client.connected:
                 _LOGGER.debug(
@@ -238,10 +602,11 @@ class CopmaxModbusPoll:
                 )
                 match register_code:
                     case 0x03:
-                        resp = await self._client.read_holding_registers(start_addr, count=count_num, device_id=slave_addr)
+                        request = self._client.read_holding_registers(start_addr, count=count_num, device_id=slave_addr)
                     case 0x04:
-                        resp = await self._client.read_input_registers(start_addr, count=count_num, device_id=slave_addr)
+                        request = self._client.read_input_registers(start_addr, count=count_num, device_id=slave_addr)
                     # case _:
+                resp = await self._request(register_code, count_num, request)
 
                 if resp.isError():
                     _LOGGER.error(f"Error reading input registers: {resp}")
@@ -262,9 +627,54 @@ class CopmaxModbusPoll:
 
         return []
 
+    async def _request(self, function_code: int, count: int, request):
+        """Await a request until its deadline, see deadline.py.
+
+        When the deadline passes the connection is renewed, so a late answer
+        cannot be taken for the answer to the next request. A lost answer is
+        not a lost gateway: the salvage and the other reads of the poll see a
+        connected client and go on, only a failed reconnect ends the poll.
+        """
+        from pymodbus.exceptions import ModbusIOException
+
+        deadline = self.deadline.deadline(function_code, count)
+        started = time.perf_counter()
+        try:
+            resp = await asyncio.wait_for(request, deadline)
+        except asyncio.TimeoutError as ex:
+            self.deadline.record_miss()
+            self._client.close()
+            await self._client.connect()
+            raise ModbusIOException(f"No answer within {deadline:.3f}s") from ex
+
+        if not resp.isError():
+            self.deadline.record(function_code, count, time.perf_counter() - started)
+        return resp
+
+    async def probe_register(
+        self, register_code: int, address: int, slave_addr: int = 1
+    ) -> tuple[str, int | None]:
+        """Read one register for discovery and classify the answer.
+
+        Returns the status and the value, or the exception code for an
+        exception response. Not counted by the circuit breaker.
+        """
+        if register_code == INPUT_REGISTER_CODE:
+            read = self._client.read_input_registers
+        else:
+            read = self._client.read_holding_registers
+        status, value = await self._probe_request(
+            lambda: read(address, count=1, device_id=slave_addr)
+        )
+        if status == PROBE_READABLE:
+            value = value[0]
+        return status, value
+
     async def modbus_write_holding_register(
         self, register_addr: int, value: int, multiplier: int = 1, slave_addr: int = 1
     ) -> int:
+        from pymodbus.exceptions import ModbusException
+
         try:
             if not self._client.connected:
                 await self._client.connect()
@@ -272,7 +682,11 @@ class CopmaxModbusPoll:
             intValue = int(self.convert_signed_to_16bit(value) * multiplier)
 
             if self._client.connected:
-                resp = await self._client.write_register(register_addr, intValue, device_id=slave_addr)
+                resp = await self._request(
+                    WRITE_REGISTER_CODE,
+                    1,
+                    self._client.write_register(register_addr, intValue, device_id=slave_addr),
+                )
 
                 if resp.isError():
                     _LOGGER.error(f"Error reading input registers: {resp}")
@@ -292,6 +706,87 @@ class CopmaxModbusPoll:
 
         return -1
 
+    async def modbus_write_holding_registers(
+        self, values: dict, slave_addr: int = 1
+    ) -> bool:
+        """Write several holding registers as one batch.
+
+        values maps address to the signed register value. Contiguous addresses
+        go out as one write multiple request, or read/write multiple when only
+        that is supported, else register by register. The requests follow each
+        other on the same connection. Stops at the first failed request.
+        """
+        from pymodbus.exceptions import ModbusException
+
+        try:
+            if not self._client.connected:
+                await self._client.connect()
+            if not self._client.connected:
+                return False
+
+            if self.write_multiple or self.read_write_multiple:
+                max_run = MAX_WRITE
+            else:
+                max_run = 1
+            for index, (start, run) in enumerate(self._write_runs(values, max_run)):
+                if index:
+                    await asyncio.sleep(self.frame_delay)
+                run = [self.convert_signed_to_16bit(int(value)) for value in run]
+                if len(run) == 1:
+                    resp = await self._request(
+                        WRITE_REGISTER_CODE,
+                        1,
+                        self._client.write_register(start, run[0], device_id=slave_addr),
+                    )
+                elif self.write_multiple:
+                    resp = await self._request(
+                        WRITE_MULTIPLE_CODE,
+                        len(run),
+                        self._client.write_registers(start, run, device_id=slave_addr),
+                    )
+                else:
+                    # Reads back the written registers, nothing else to read
+                    resp = await self._request(
+                        READ_WRITE_MULTIPLE_CODE,
+                        len(run),
+                        self._client.readwrite_registers(
+                            read_address=start,
+                            read_count=len(run),
+                            write_address=start,
+                            values=run,
+                            device_id=slave_addr,
+                        ),
+                    )
+                if resp.isError():
+                    _LOGGER.error(f"Error writing registers {start}:{len(run)}: {resp}")
+                    return False
+            return True
+
+        except ModbusException as exception_error:
+            _LOGGER.warning(
+                f"{self._host}:{self._port} - connection failed, retrying in pymodbus ({exception_error!s})"
+            )
+        except Exception as general_error:
+            _LOGGER.error(
+                f"{self._host}:{self._port} - unexpected error during connection: {general_error!s}"
+            )
+
+        return False
+
+    @staticmethod
+    def _write_runs(values: dict, max_run: int):
+        """Split the values into runs of at most max_run contiguous addresses."""
+        run_start, run = None, []
+        for address in sorted(values):
+            if run and (address != run_start + len(run) or len(run) == max_run):
+                yield run_start, run
+                run = []
+            if not run:
+                run_start = address
+            run.append(values[address])
+        if run:
+            yield run_start, run
+
     def convert_16bit_to_signed(self, value):
         # Ensure the value is within the 16-bit range
         if value < 0 or value > 65535:
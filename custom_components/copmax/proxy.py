@@ -0,0 +1,206 @@
+"""Modbus TCP server answering other clients from the register image.
+
+The heat pump has one RS-485 bus, and every extra master on it (the RWR470
+display, the vendor service app, a Node-RED flow) adds traffic and collides
+with the poller. With the proxy, the integration stays the only master: reads
+are answered from the latest snapshot without touching the bus, writes go
+through the same serialized write path as the number and switch entities.
+
+Reads of input registers at AGE_OFFSET + address return the age in seconds of
+the register at address, so a client can tell how old a value is. A register
+that is not fresh is answered with exception 0x0B, gateway target device
+failed to respond, like a gateway that could not reach the heat pump.
+"""
+
+import asyncio
+from logging import getLogger
+import struct
+
+from .const import (
+    DEFAULT_PROXY_HOST,
+    HOLDING_REGISTER_CODE,
+    INPUT_REGISTER_CODE,
+    MAX_WRITE,
+    POLL_GROUPS,
+    WRITE_MULTIPLE_CODE,
+    WRITE_REGISTER_CODE,
+)
+
+_LOGGER = getLogger(__name__)
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+SERVER_DEVICE_FAILURE = 0x04
+GATEWAY_TARGET_FAILED = 0x0B
+
+AGE_OFFSET = 1000
+MAX_READ = 125  # registers per read, from the Modbus specification
+
+# Address -> function code of the register, from the poll groups
+_REGISTER_CODES = {
+    address: register_code
+    for register_code, start, count, _ in POLL_GROUPS.values()
+    for address in range(start, start + count)
+}
+
+
+class ProxyException(Exception):
+    """Answer the request with a Modbus exception response."""
+
+    def __init__(self, code: int):
+        super().__init__(code)
+        self.code = code
+
+
+class CopmaxModbusProxy:
+    """Modbus TCP server in front of a coordinator."""
+
+    def __init__(self, coordinator, port: int, host: str = DEFAULT_PROXY_HOST):
+        self._coordinator = coordinator
+        self.port = port
+        self.host = host
+        self._server = None
+        self._connections = set()
+
+        # Statistics
+        self.clients = 0
+        self.reads = 0
+        self.writes = 0
+        self.exceptions = 0
+
+    async def async_start(self):
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port
+        )
+        _LOGGER.info(f"Modbus proxy listening on {self.host}:{self.port}")
+
+    async def async_stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle_client(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        _LOGGER.debug(f"Modbus proxy client {peer} connected")
+        self.clients += 1
+        self._connections.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                transaction, protocol, length, unit = struct.unpack(">HHHB", header)
+                if protocol != 0 or not 2 <= length <= 254:
+                    break
+                pdu = await reader.readexactly(length - 1)
+                response = await self._handle_pdu(pdu)
+                writer.write(
+                    struct.pack(">HHHB", transaction, 0, len(response) + 1, unit)
+                    + response
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            self.clients -= 1
+            writer.close()
+            _LOGGER.debug(f"Modbus proxy client {peer} disconnected")
+
+    async def _handle_pdu(self, pdu: bytes) -> bytes:
+        function_code = pdu[0]
+        try:
+            if function_code in (HOLDING_REGISTER_CODE, INPUT_REGISTER_CODE):
+                address, count = struct.unpack(">HH", pdu[1:5])
+                values = self._read(function_code, address, count)
+                self.reads += 1
+                return struct.pack(f">BB{count}H", function_code, 2 * count, *values)
+
+            if function_code == WRITE_REGISTER_CODE:
+                address, value = struct.unpack(">HH", pdu[1:5])
+                await self._write(address, [value])
+                return pdu[:5]
+
+            if function_code == WRITE_MULTIPLE_CODE:
+                address, count, byte_count = struct.unpack(">HHB", pdu[1:6])
+                if not 1 <= count <= MAX_WRITE or byte_count != 2 * count:
+                    raise ProxyException(ILLEGAL_DATA_VALUE)
+                values = struct.unpack(f">{count}H", pdu[6 : 6 + byte_count])
+                await self._write(address, values)
+                return pdu[:5]
+
+            raise ProxyException(ILLEGAL_FUNCTION)
+        except struct.error:
+            return self._exception(function_code, ILLEGAL_DATA_VALUE)
+        except ProxyException as ex:
+            return self._exception(function_code, ex.code)
+        except Exception as ex:  # pylint: disable=broad-except
+            # Answer instead of dropping the client, e.g. a write that lost
+            # the connection to the heat pump
+            _LOGGER.warning(f"Modbus proxy request {pdu.hex()} failed: {ex!r}")
+            return self._exception(function_code, SERVER_DEVICE_FAILURE)
+
+    def _exception(self, function_code: int, code: int) -> bytes:
+        self.exceptions += 1
+        return struct.pack(">BB", function_code | 0x80, code)
+
+    def _read(self, function_code: int, address: int, count: int) -> list:
+        if not 1 <= count <= MAX_READ:
+            raise ProxyException(ILLEGAL_DATA_VALUE)
+        data = self._coordinator.data
+        if data is None:
+            raise ProxyException(GATEWAY_TARGET_FAILED)
+
+        if function_code == INPUT_REGISTER_CODE and address >= AGE_OFFSET:
+            return [
+                self._age(data, register - AGE_OFFSET)
+                for register in range(address, address + count)
+            ]
+
+        values = []
+        for register in range(address, address + count):
+            if _REGISTER_CODES.get(register) != function_code:
+                raise ProxyException(ILLEGAL_DATA_ADDRESS)
+            if not data.is_fresh(register):
+                raise ProxyException(GATEWAY_TARGET_FAILED)
+            values.append(data.registers[register] & 0xFFFF)
+        return values
+
+    @staticmethod
+    def _age(data, register: int) -> int:
+        if register not in _REGISTER_CODES:
+            raise ProxyException(ILLEGAL_DATA_ADDRESS)
+        age = data.age(register)
+        return 0xFFFF if age is None else min(int(age), 0xFFFE)
+
+    async def _write(self, address: int, values):
+        if any(
+            _REGISTER_CODES.get(register) != HOLDING_REGISTER_CODE
+            for register in range(address, address + len(values))
+        ):
+            raise ProxyException(ILLEGAL_DATA_ADDRESS)
+
+        # The wire values are unsigned, the write path takes signed values.
+        # The whole run goes out as one request when the heat pump takes it.
+        if not await self._coordinator.async_write_registers(
+            {
+                register: value - 0x10000 if value & 0x8000 else value
+                for register, value in enumerate(values, start=address)
+            }
+        ):
+            raise ProxyException(SERVER_DEVICE_FAILURE)
+        self.writes += 1
+        await self._coordinator.async_request_refresh()
+
+    def as_dict(self) -> dict:
+        return {
+            "host": self.host,
+            "port": self.port,
+            "clients": self.clients,
+            "reads": self.reads,
+            "writes": self.writes,
+            "exceptions": self.exceptions,
+        }
@@ -0,0 +1,688 @@
+"""Register map of the heat pump.
+
+One entry per entity. The platforms build their entity descriptions from this
+map, so a new register only needs a line here. Kept free of Home Assistant
+imports so it can be used outside of it.
+"""
+
+from dataclasses import dataclass
+
+from .const import DEFAULT_TEMP_DEADBAND, DEFAULT_TEMP_DEADBAND_RELATIVE
+
+
+@dataclass(frozen=True, kw_only=True, slots=True)
+class Register:
+    """One register, or derived value, and how it is shown."""
+
+    key: str
+    address: int | str
+    platform: str
+    kind: str
+    name: str
+    icon: str
+    device_class: str | None = None
+    unit: str | None = None
+    state_class: str | None = None
+    # Registers hold the displayed value times the divisor
+    divisor: int = 1
+    # Minimum change, absolute in the displayed unit and relative to the last
+    # published value, before a new state is written
+    deadband: float | None = None
+    deadband_relative: float | None = None
+    minimum: float | None = None
+    maximum: float | None = None
+    step: float | None = None
+
+
+REGISTERS: tuple[Register, ...] = (
+    # Temperatures, input registers
+    Register(
+        key="I_RT",
+        address=0,
+        platform="sensor",
+        kind="TEMP",
+        name="Return Temp",
+        icon="mdi:thermometer-low",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        deadband=DEFAULT_TEMP_DEADBAND,
+        deadband_relative=DEFAULT_TEMP_DEADBAND_RELATIVE,
+    ),
+    Register(
+        key="I_ST",
+        address=1,
+        platform="sensor",
+        kind="TEMP",
+        name="Output Temp",
+        icon="mdi:thermometer-high",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        deadband=DEFAULT_TEMP_DEADBAND,
+        deadband_relative=DEFAULT_TEMP_DEADBAND_RELATIVE,
+    ),
+    Register(
+        key="I_OT",
+        address=2,
+        platform="sensor",
+        kind="TEMP",
+        name="Outdoor Temp",
+        icon="mdi:home-thermometer-outline",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        deadband=DEFAULT_TEMP_DEADBAND,
+        deadband_relative=DEFAULT_TEMP_DEADBAND_RELATIVE,
+    ),
+    Register(
+        key="I_HT",
+        address=3,
+        platform="sensor",
+        kind="TEMP",
+        name="Hot water tank Temp",
+        icon="mdi:thermometer",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        deadband=DEFAULT_TEMP_DEADBAND,
+        deadband_relative=DEFAULT_TEMP_DEADBAND_RELATIVE,
+    ),
+    Register(
+        key="I_CT",
+        address=4,
+        platform="sensor",
+        kind="TEMP",
+        name="Condenser Temp",
+        icon="mdi:thermometer",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        deadband=DEFAULT_TEMP_DEADBAND,
+        deadband_relative=DEFAULT_TEMP_DEADBAND_RELATIVE,
+    ),
+    Register(
+        key="I_ET",
+        address=5,
+        platform="sensor",
+        kind="TEMP",
+        name="Exhaust gas Temp",
+        icon="mdi:thermometer",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        deadband=DEFAULT_TEMP_DEADBAND,
+        deadband_relative=DEFAULT_TEMP_DEADBAND_RELATIVE,
+    ),
+    # Status registers
+    Register(
+        key="I_R6",
+        address=6,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R6",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R7",
+        address=7,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R7",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R8",
+        address=8,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R8",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R9",
+        address=9,
+        platform="sensor",
+        kind="STATUS",
+        name="Remote run signal",
+        icon="mdi:remote",
+    ),
+    Register(
+        key="I_R10",
+        address=10,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R10",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R11",
+        address=11,
+        platform="sensor",
+        kind="STATUS",
+        name="Comp run",
+        icon="mdi:run",
+    ),
+    Register(
+        key="I_R12",
+        address=12,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R12",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R13",
+        address=13,
+        platform="sensor",
+        kind="STATUS",
+        name="Circ. pump",
+        icon="mdi:pump",
+    ),
+    Register(
+        key="I_R14",
+        address=14,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R14",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R15",
+        address=15,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R15",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R16",
+        address=16,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R16",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R17",
+        address=17,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R17",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R18",
+        address=18,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R18",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R19",
+        address=19,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R19",
+        icon="mdi:information",
+    ),
+    Register(
+        key="I_R20",
+        address=20,
+        platform="sensor",
+        kind="STATUS",
+        name="Status_I_R20",
+        icon="mdi:information",
+    ),
+    # Values derived from the register image, address is the attribute
+    Register(
+        key="D_HEAT_POWER",
+        address="heat_power",
+        platform="sensor",
+        kind="DERIVED",
+        name="Heat output",
+        icon="mdi:heat-wave",
+        device_class="power",
+        unit="W",
+        state_class="measurement",
+    ),
+    Register(
+        key="D_COP",
+        address="cop",
+        platform="sensor",
+        kind="DERIVED",
+        name="COP",
+        icon="mdi:speedometer",
+        state_class="measurement",
+    ),
+    Register(
+        key="D_ENERGY_TODAY",
+        address="energy_today",
+        platform="sensor",
+        kind="DERIVED",
+        name="Heat energy today",
+        icon="mdi:lightning-bolt",
+        device_class="energy",
+        unit="kWh",
+        state_class="total_increasing",
+    ),
+    # User settings, holding registers
+    Register(
+        key="H_ST01",
+        address=38,
+        platform="number",
+        kind="ST",
+        name="Cooling target",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=60.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST02",
+        address=39,
+        platform="number",
+        kind="ST",
+        name="Heating target",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=80.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST03",
+        address=40,
+        platform="number",
+        kind="ST",
+        name="Cooling hysteresis",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=10.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST04",
+        address=41,
+        platform="number",
+        kind="ST",
+        name="Heating hysteresis",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=10.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST05",
+        address=42,
+        platform="number",
+        kind="ST",
+        name="Heat compensation target",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=30.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST06",
+        address=43,
+        platform="number",
+        kind="ST",
+        name="Heat compensation factor",
+        icon="mdi:information",
+        minimum=0.0,
+        maximum=30.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST07",
+        address=44,
+        platform="number",
+        kind="ST",
+        name="Heating rod start",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=-10.0,
+        maximum=20.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST08",
+        address=45,
+        platform="number",
+        kind="ST",
+        name="Heating rod diff stop (@ST07)",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=1.0,
+        maximum=20.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST09",
+        address=46,
+        platform="number",
+        kind="ST",
+        name="Hot water target",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=80.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST10",
+        address=47,
+        platform="number",
+        kind="ST",
+        name="Hot water diff",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=1.0,
+        maximum=10.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST11",
+        address=48,
+        platform="number",
+        kind="ST",
+        name="Cooling temp min",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=60.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST12",
+        address=49,
+        platform="number",
+        kind="ST",
+        name="Cooling temp max",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=60.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST13",
+        address=50,
+        platform="number",
+        kind="ST",
+        name="Heating temp min",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=80.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST14",
+        address=51,
+        platform="number",
+        kind="ST",
+        name="Heating temp max",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=80.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST15",
+        address=52,
+        platform="number",
+        kind="ST",
+        name="Hot water temp min",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=1.0,
+        maximum=20.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST16",
+        address=53,
+        platform="number",
+        kind="ST",
+        name="Hot water temp max",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=1.0,
+        maximum=20.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST17",
+        address=54,
+        platform="number",
+        kind="ST",
+        name="Check/adjust time delay",
+        icon="mdi:information",
+        unit="s",
+        divisor=100,
+        minimum=1,
+        # The largest value a signed register holds at this divisor
+        maximum=327,
+        step=1,
+    ),
+    Register(
+        key="H_ST18",
+        address=55,
+        platform="number",
+        kind="ST",
+        name="Run mode transfer temp",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=1.0,
+        maximum=20.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_ST19",
+        address=56,
+        platform="number",
+        kind="ST",
+        name="Run mode transfer temp diff",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=1.0,
+        maximum=20.0,
+        step=0.1,
+    ),
+    # Special functions, holding registers
+    Register(
+        key="H_SF01",
+        address=24,
+        platform="number",
+        kind="SF",
+        name="System mode",
+        icon="mdi:information",
+        divisor=100,
+        minimum=0,
+        maximum=2,
+        step=1,
+    ),
+    Register(
+        key="H_SF02",
+        address=25,
+        platform="number",
+        kind="SF",
+        name="Ambient temp stop HP",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=-20.0,
+        maximum=20.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_SF03",
+        address=26,
+        platform="number",
+        kind="SF",
+        name="Ambient temp restart HP (@SF02)",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=10.0,
+        step=0.1,
+    ),
+    Register(
+        key="H_SF06",
+        address=29,
+        platform="number",
+        kind="SF",
+        name="Outdoor temp anti-freeze",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=0.0,
+        maximum=10.0,
+        step=1,
+    ),
+    Register(
+        key="H_SF07",
+        address=30,
+        platform="number",
+        kind="SF",
+        name="Outdoor temp anti-freeze restart (@ST06)",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=-1.0,
+        maximum=10.0,
+        step=1,
+    ),
+    Register(
+        key="H_SF08",
+        address=31,
+        platform="number",
+        kind="SF",
+        name="Water temp anti-freeze",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=1.0,
+        maximum=10.0,
+        step=1,
+    ),
+    Register(
+        key="H_SF09",
+        address=32,
+        platform="number",
+        kind="SF",
+        name="Water temp anti-freeze restart (@SF08)",
+        icon="mdi:temperature-celsius",
+        device_class="temperature",
+        unit="°C",
+        divisor=100,
+        minimum=1.0,
+        maximum=10.0,
+        step=1,
+    ),
+    # Local switch, not backed by a register
+    Register(
+        key="NUMBER_MODE",
+        address="NUMBER_INPUT_MODE",
+        platform="switch",
+        kind="SYS",
+        name="Number input mode",
+        icon="mdi:pencil-outline",
+        device_class="switch",
+    ),
+    # Special functions read as on/off
+    Register(
+        key="H_SF04",
+        address=27,
+        platform="switch",
+        kind="SF",
+        name="Compensation heating",
+        icon="mdi:temperature-celsius",
+        device_class="switch",
+    ),
+    Register(
+        key="H_SF05",
+        address=28,
+        platform="switch",
+        kind="SF",
+        name="Heat recovery",
+        icon="mdi:electric-switch",
+        device_class="switch",
+    ),
+    Register(
+        key="H_SF13",
+        address=36,
+        platform="switch",
+        kind="SF",
+        name="Hot water",
+        icon="mdi:electric-switch",
+        device_class="switch",
+    ),
+    Register(
+        key="H_SF14",
+        address=37,
+        platform="switch",
+        kind="SF",
+        name="A/C remote control",
+        icon="mdi:electric-switch",
+        device_class="switch",
+    ),
+)
+
+
+def registers_for(platform: str) -> tuple[Register, ...]:
+    """Return the registers shown by a platform."""
+    return tuple(register for register in REGISTERS if register.platform == platform)
+
+
+def register_by_key(key: str) -> Register:
+    """Return the register with a key."""
+    return next(register for register in REGISTERS if register.key == key)
@@ -0,0 +1,187 @@
+"""Register log at full poll resolution in a size-capped, memory-mapped file.
+
+The file is a header followed by a ring of fixed-width records, one per poll:
+the time as a float64 and every register of the poll groups as an int16, in
+address order (input registers 0-20, then holding registers 24-56). Registers
+never read are stored as MISSING, so the value 0x8000 of an unsigned register
+reads as missing. When the ring is full the oldest records are overwritten.
+
+Appending packs one record straight into the mapping, a few microseconds and
+no system call. Creating, opening and closing the file do block, run them in
+the executor when in Home Assistant.
+"""
+
+import csv
+from datetime import datetime
+import mmap
+import os
+import struct
+
+from .const import POLL_GROUPS
+
+MAGIC = b"CPMXRING"
+VERSION = 1
+MISSING = -32768
+
+ADDRESSES = sorted(
+    address
+    for _, start, count, _ in POLL_GROUPS.values()
+    for address in range(start, start + count)
+)
+
+# Positions in a record of the registers of unsigned poll groups
+_UNSIGNED = [
+    ADDRESSES.index(address)
+    for _, start, count, signed in POLL_GROUPS.values()
+    if not signed
+    for address in range(start, start + count)
+]
+
+# Magic, version, record size, capacity, records written
+HEADER = struct.Struct("<8sHHIQ")
+HEADER_SIZE = 64
+RECORD = struct.Struct(f"<d{len(ADDRESSES)}h")
+TIMESTAMP = struct.Struct("<d")
+
+
+def _int16(value) -> int:
+    if value is None:
+        return MISSING
+    return value - 0x10000 if value > 0x7FFF else value
+
+
+class CopmaxRingLog:
+    """Writer of a ring log file, reopening an existing log of the same size."""
+
+    def __init__(self, path: str, capacity: int):
+        self.path = path
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * RECORD.size
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != size:
+                # New file, or a log of another size or layout: start over
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        magic, version, record_size, file_capacity, count = HEADER.unpack_from(
+            self._map
+        )
+        if (magic, version, record_size, file_capacity) != (
+            MAGIC,
+            VERSION,
+            RECORD.size,
+            capacity,
+        ):
+            count = 0
+        self.count = count
+        self._write_header()
+
+    def _write_header(self):
+        HEADER.pack_into(
+            self._map, 0, MAGIC, VERSION, RECORD.size, self.capacity, self.count
+        )
+
+    def append(self, timestamp: float, registers):
+        """Add one sample of the register image, overwriting the oldest if full."""
+        get = registers.get
+        RECORD.pack_into(
+            self._map,
+            HEADER_SIZE + (self.count % self.capacity) * RECORD.size,
+            timestamp,
+            *[_int16(get(address)) for address in ADDRESSES],
+        )
+        self.count += 1
+        self._write_header()
+
+    def close(self):
+        self._map.flush()
+        self._map.close()
+
+
+class CopmaxRingLogReader:
+    """Read-only view of a ring log, also while it is being written.
+
+    Slices are memoryviews of the mapping, nothing is copied until the records
+    are unpacked. A record being written at the moment of reading can be torn.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, self.capacity, _ = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a register log of version {VERSION}")
+        self._records = memoryview(self._map)[HEADER_SIZE:]
+
+    @property
+    def count(self) -> int:
+        """Records written since the log was created."""
+        return HEADER.unpack_from(self._map)[4]
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def _bisect(self, oldest: int, length: int, timestamp: float) -> int:
+        """Index of the first record at or after timestamp, 0 is the oldest."""
+        low, high = 0, length
+        while low < high:
+            middle = (low + high) // 2
+            slot = (oldest + middle) % self.capacity
+            if TIMESTAMP.unpack_from(self._records, slot * RECORD.size)[0] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def slice(self, start: float | None = None, end: float | None = None) -> list:
+        """Memoryviews of the records in [start, end), at most two at the wrap."""
+        count = self.count
+        length = min(count, self.capacity)
+        oldest = (count - length) % self.capacity
+        first = 0 if start is None else self._bisect(oldest, length, start)
+        last = length if end is None else self._bisect(oldest, length, end)
+        if first >= last:
+            return []
+
+        first_slot = (oldest + first) % self.capacity
+        last_slot = (oldest + last - 1) % self.capacity + 1
+        if first_slot < last_slot:
+            segments = [(first_slot, last_slot)]
+        else:
+            segments = [(first_slot, self.capacity), (0, last_slot)]
+        return [
+            self._records[a * RECORD.size : b * RECORD.size] for a, b in segments
+        ]
+
+    def records(self, start: float | None = None, end: float | None = None):
+        """Iterate over (timestamp, values) in [start, end), values by ADDRESSES."""
+        for view in self.slice(start, end):
+            for timestamp, *values in RECORD.iter_unpack(view):
+                for index in _UNSIGNED:
+                    if values[index] != MISSING:
+                        values[index] &= 0xFFFF
+                yield timestamp, values
+
+    def export_csv(self, file, start: float | None = None, end: float | None = None):
+        """Write the records in [start, end) as CSV, missing registers empty."""
+        writer = csv.writer(file)
+        writer.writerow(["time", *ADDRESSES])
+        rows = 0
+        for timestamp, values in self.records(start, end):
+            writer.writerow(
+                [
+                    datetime.fromtimestamp(timestamp).isoformat(timespec="milliseconds"),
+                    *["" if value == MISSING else value for value in values],
+                ]
+            )
+            rows += 1
+        return rows
+
+    def close(self):
+        self._records.release()
+        self._map.close()
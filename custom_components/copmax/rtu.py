@@ -0,0 +1,227 @@
+"""Modbus RTU framing over a raw TCP stream, for gateways in transparent mode."""
+
+import asyncio
+from logging import getLogger
+import struct
+import time
+
+from pymodbus.exceptions import ModbusException
+
+_LOGGER = getLogger(__name__)
+
+READ_HOLDING_REGISTERS = 0x03
+READ_INPUT_REGISTERS = 0x04
+WRITE_SINGLE_REGISTER = 0x06
+WRITE_MULTIPLE_REGISTERS = 0x10
+READ_WRITE_MULTIPLE_REGISTERS = 0x17
+
+
+def _crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def crc16(data: bytes) -> int:
+    """Modbus CRC-16 of data."""
+    crc = 0xFFFF
+    for byte in data:
+        crc = (crc >> 8) ^ _CRC_TABLE[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def frame(pdu: bytes) -> bytes:
+    """Append the CRC, low byte first, to an RTU frame."""
+    return pdu + struct.pack("<H", crc16(pdu))
+
+
+class RtuFrameError(ModbusException):
+    """A response frame was truncated, corrupt or did not match the request."""
+
+
+class RtuResponse:
+    """Response with the same shape as the pymodbus responses used by the poller."""
+
+    def __init__(self, function_code: int, registers=None, exception_code=None):
+        self.function_code = function_code
+        self.registers = registers or []
+        self.exception_code = exception_code
+
+    def isError(self) -> bool:
+        return self.exception_code is not None
+
+    def __str__(self):
+        if self.isError():
+            return f"Exception response fc={self.function_code:#04x} code={self.exception_code}"
+        return f"Response fc={self.function_code:#04x} registers={self.registers}"
+
+
+class CopmaxRtuClient:
+    """Modbus RTU client over TCP that does the framing and CRC itself.
+
+    Responses are read by their exact expected length, so a request can go out
+    as soon as the last byte of the previous response has arrived (plus the
+    3.5 character RTU silence), and a short frame is detected as truncated
+    instead of waiting for a gateway timeout.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float, baudrate: int = 9600):
+        self._host = host
+        self._port = port
+        self.timeout = timeout
+        # 3.5 characters of 11 bits (start, 8 data, parity/stop, stop)
+        self._silent_interval = 3.5 * 11 / baudrate
+        self._reader = None
+        self._writer = None
+        self._last_frame = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> bool:
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self._host, self._port), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as ex:
+            _LOGGER.warning(f"{self._host}:{self._port} - connect failed: {ex!s}")
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+
+    async def read_holding_registers(self, address: int, count: int = 1, device_id: int = 1):
+        return await self._read(READ_HOLDING_REGISTERS, address, count, device_id)
+
+    async def read_input_registers(self, address: int, count: int = 1, device_id: int = 1):
+        return await self._read(READ_INPUT_REGISTERS, address, count, device_id)
+
+    async def write_register(self, address: int, value: int, device_id: int = 1):
+        pdu = struct.pack(">BBHH", device_id, WRITE_SINGLE_REGISTER, address, value)
+        body = await self._transaction(pdu, 4)
+        if isinstance(body, RtuResponse):
+            return body
+        if body != pdu[2:]:
+            raise RtuFrameError(f"Write echo mismatch: {body.hex()}")
+        return RtuResponse(WRITE_SINGLE_REGISTER, [value])
+
+    async def write_registers(self, address: int, values, device_id: int = 1):
+        count = len(values)
+        pdu = struct.pack(
+            f">BBHHB{count}H",
+            device_id,
+            WRITE_MULTIPLE_REGISTERS,
+            address,
+            count,
+            2 * count,
+            *values,
+        )
+        body = await self._transaction(pdu, 4)
+        if isinstance(body, RtuResponse):
+            return body
+        if body != pdu[2:6]:
+            raise RtuFrameError(f"Write multiple echo mismatch: {body.hex()}")
+        return RtuResponse(WRITE_MULTIPLE_REGISTERS, list(values))
+
+    async def readwrite_registers(
+        self,
+        *,
+        read_address: int = 0,
+        read_count: int = 0,
+        write_address: int = 0,
+        values=(),
+        device_id: int = 1,
+    ):
+        count = len(values)
+        pdu = struct.pack(
+            f">BBHHHHB{count}H",
+            device_id,
+            READ_WRITE_MULTIPLE_REGISTERS,
+            read_address,
+            read_count,
+            write_address,
+            count,
+            2 * count,
+            *values,
+        )
+        return await self._read_body(pdu, read_count)
+
+    async def _read(self, function_code: int, address: int, count: int, device_id: int):
+        pdu = struct.pack(">BBHH", device_id, function_code, address, count)
+        return await self._read_body(pdu, count)
+
+    async def _read_body(self, pdu: bytes, count: int):
+        """Send a request answered with a byte count and count registers."""
+        body = await self._transaction(pdu, 1 + 2 * count)
+        if isinstance(body, RtuResponse):
+            return body
+        if body[0] != 2 * count:
+            raise RtuFrameError(f"Byte count {body[0]} for {count} registers")
+        return RtuResponse(pdu[1], list(struct.unpack(f">{count}H", body[1:])))
+
+    async def _transaction(self, pdu: bytes, body_length: int):
+        """Send one request and return the response body, without address and fc.
+
+        Exception responses are returned as an error RtuResponse. Any framing
+        problem drops the connection, so the next request starts on a clean
+        stream instead of reading the rest of a broken frame.
+        """
+        if not self.connected:
+            raise RtuFrameError(f"{self._host}:{self._port} - not connected")
+
+        silence = self._last_frame + self._silent_interval - time.monotonic()
+        if silence > 0:
+            await asyncio.sleep(silence)
+
+        self._writer.write(frame(pdu))
+        deadline = time.monotonic() + self.timeout
+        try:
+            header = await self._read_exactly(2, deadline)
+            if header[0] != pdu[0] or header[1] & 0x7F != pdu[1]:
+                raise RtuFrameError(f"Unexpected response header {header.hex()}")
+
+            if header[1] & 0x80:
+                body = await self._read_exactly(3, deadline)
+                self._check_crc(header + body)
+                return RtuResponse(pdu[1], exception_code=body[0])
+
+            body = await self._read_exactly(body_length + 2, deadline)
+            self._check_crc(header + body)
+            return body[:-2]
+        except RtuFrameError:
+            self.close()
+            raise
+        finally:
+            self._last_frame = time.monotonic()
+
+    async def _read_exactly(self, length: int, deadline: float) -> bytes:
+        try:
+            return await asyncio.wait_for(
+                self._reader.readexactly(length), max(0.0, deadline - time.monotonic())
+            )
+        except asyncio.IncompleteReadError as ex:
+            raise RtuFrameError(
+                f"Truncated frame, got {len(ex.partial)} of {length} bytes"
+            ) from ex
+        except asyncio.TimeoutError as ex:
+            raise RtuFrameError(
+                f"Timeout after {self.timeout}s waiting for {length} bytes"
+            ) from ex
+
+    @staticmethod
+    def _check_crc(data: bytes):
+        if crc16(data[:-2]) != struct.unpack("<H", data[-2:])[0]:
+            raise RtuFrameError(f"CRC error in {data.hex()}")
@@ -0,0 +1,111 @@
+"""Setpoint schedule, a profile of holding register values per time slot.
+
+A slot starts at a time of day, on all or some weekdays, and holds until the
+next slot starts. Profiles name the registers by key and give the value in
+the displayed unit, e.g. {"H_ST02": 35.0, "H_SF13": 1}. The schedule only
+says what the registers should hold; comparing with the register image and
+writing is left to the coordinator. Kept free of Home Assistant imports.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from .registers import REGISTERS
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+WEEK = 7 * 24 * 60  # minutes
+
+# Holding registers that can be scheduled, by key
+_WRITABLE = {
+    register.key: register
+    for register in REGISTERS
+    if register.platform in ("number", "switch") and isinstance(register.address, int)
+}
+
+
+def _minute(start: str) -> int:
+    hours, _, minutes = start.partition(":")
+    minute = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= minute < 24 * 60:
+        raise ValueError(f"Start {start} is not a time of day")
+    return minute
+
+
+def _raw_values(profile: dict) -> dict[int, int]:
+    """Register values of a profile, as stored in the registers."""
+    values = {}
+    for key, value in profile.items():
+        register = _WRITABLE.get(key)
+        if register is None:
+            raise ValueError(f"{key} is not a writable register")
+        if register.minimum is not None and value < register.minimum:
+            raise ValueError(f"{key} {value} is below {register.minimum}")
+        if register.maximum is not None and value > register.maximum:
+            raise ValueError(f"{key} {value} is above {register.maximum}")
+        values[register.address] = round(value * register.divisor)
+    return values
+
+
+class CopmaxSchedule:
+    """Weekly schedule of register profiles.
+
+    slots are plain dicts, as saved in the Store:
+    {"start": "06:30", "days": ["mon", "tue"], "registers": {...}}, days
+    optional. Raises ValueError on a slot that cannot be written.
+    """
+
+    def __init__(self, slots: list[dict]):
+        self.slots = slots
+        starts = {}
+        for slot in slots:
+            minute = _minute(slot["start"])
+            values = _raw_values(slot["registers"])
+            for day in slot.get("days") or WEEKDAYS:
+                if day not in WEEKDAYS:
+                    raise ValueError(f"{day} is not one of {', '.join(WEEKDAYS)}")
+                # A later slot at the same time adds to and overrides the first
+                starts.setdefault(WEEKDAYS.index(day) * 24 * 60 + minute, {}).update(
+                    values
+                )
+        self._starts = sorted(starts)
+        self._values = [starts[start] for start in self._starts]
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    @staticmethod
+    def _week_minute(now: datetime) -> int:
+        return now.weekday() * 24 * 60 + now.hour * 60 + now.minute
+
+    def active(self, now: datetime) -> dict[int, int]:
+        """Address -> value of the slot in force at now, {} without slots."""
+        if not self._starts:
+            return {}
+        # Before the first start of the week the last slot of the week holds
+        index = bisect_right(self._starts, self._week_minute(now)) - 1
+        return self._values[index]
+
+    def next_start(self, now: datetime) -> datetime | None:
+        """Time of the next slot boundary after now."""
+        if not self._starts:
+            return None
+        minute = self._week_minute(now)
+        index = bisect_right(self._starts, minute)
+        start = self._starts[index] if index < len(self._starts) else self._starts[0]
+        return now.replace(second=0, microsecond=0) + timedelta(
+            minutes=(start - minute - 1) % WEEK + 1
+        )
+
+
+def register_diff(values: dict[int, int], data) -> dict[int, int]:
+    """The values that the register image of a snapshot does not hold yet.
+
+    A register that is not fresh is written, its value cannot be trusted.
+    """
+    return {
+        address: value
+        for address, value in values.items()
+        if data is None
+        or not data.is_fresh(address)
+        or data.registers[address] & 0xFFFF != value & 0xFFFF
+    }
@@ -0,0 +1,125 @@
+"""Scheduler spreading the polls of all heat pumps over time."""
+
+import asyncio
+from contextlib import asynccontextmanager
+import random
+import time
+
+from .const import HOST_CONCURRENCY, SCHEDULER_JITTER
+
+
+class _Member:
+    """A coordinator in the fleet and its poll statistics."""
+
+    def __init__(self, coordinator, host: str):
+        self.coordinator = coordinator
+        self.host = host
+        self.polls = 0
+        self.failures = 0
+        self.poll_time = 0.0
+        self.max_poll_time = 0.0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.next_at = None
+
+
+class CopmaxScheduler:
+    """Shared by all config entries, in hass.data[DOMAIN].
+
+    Each coordinator gets a slot on a grid of its update interval, the slots
+    of n coordinators are interval / n apart with a little jitter. So ten heat
+    pumps poll one after another instead of all at the same second. Polls and
+    writes through the same gateway host take a semaphore, as the gateway
+    serves one RS-485 bus.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._members: dict[object, _Member] = {}
+        self._host_locks: dict[str, asyncio.Semaphore] = {}
+
+    def add(self, coordinator, host: str):
+        """Add a coordinator to the fleet, returns a function removing it."""
+        self._members[coordinator] = _Member(coordinator, host)
+        self._host_locks.setdefault(host, asyncio.Semaphore(HOST_CONCURRENCY))
+
+        def remove():
+            member = self._members.pop(coordinator)
+            if not any(other.host == member.host for other in self._members.values()):
+                self._host_locks.pop(member.host, None)
+
+        return remove
+
+    def next_refresh(self, coordinator) -> float:
+        """Loop time of the next slot of a coordinator, after now."""
+        interval = coordinator.update_interval.total_seconds()
+        members = list(self._members)
+        spacing = interval / len(members)
+        now = self._loop.time()
+
+        slot = now - now % interval + members.index(coordinator) * spacing
+        while slot <= now:
+            slot += interval
+        slot += random.uniform(0, spacing * SCHEDULER_JITTER)
+        self._members[coordinator].next_at = slot
+        return slot
+
+    def is_idle(self, coordinator, duration: float) -> bool:
+        """Check if the gateway of a coordinator is free for at least a while.
+
+        Free means nobody holds it and no coordinator on it is due to poll
+        within the duration, so low priority work can use it without delaying
+        a poll.
+        """
+        host = self._members[coordinator].host
+        if self._host_locks[host].locked():
+            return False
+        due = self._loop.time() + duration
+        return all(
+            member.next_at is None or member.next_at > due
+            for member in self._members.values()
+            if member.host == host
+        )
+
+    def host_lock(self, coordinator) -> asyncio.Semaphore:
+        """The semaphore of the gateway of a coordinator, e.g. for writes."""
+        return self._host_locks[self._members[coordinator].host]
+
+    @asynccontextmanager
+    async def slot(self, coordinator):
+        """Hold the gateway of a coordinator while it polls, and time the poll."""
+        member = self._members[coordinator]
+        waiting = time.monotonic()
+        async with self._host_locks[member.host]:
+            started = time.monotonic()
+            member.wait_time += started - waiting
+            member.max_wait_time = max(member.max_wait_time, started - waiting)
+            try:
+                yield
+            except Exception:
+                member.failures += 1
+                raise
+            finally:
+                duration = time.monotonic() - started
+                member.polls += 1
+                member.poll_time += duration
+                member.max_poll_time = max(member.max_poll_time, duration)
+
+    def as_dict(self) -> dict:
+        """Aggregate metrics of the fleet."""
+        members = list(self._members.values())
+        polls = sum(member.polls for member in members)
+        return {
+            "coordinators": len(members),
+            "hosts": len(self._host_locks),
+            "polls": polls,
+            "failures": sum(member.failures for member in members),
+            "mean_poll_time": (
+                sum(member.poll_time for member in members) / polls if polls else None
+            ),
+            "max_poll_time": max((m.max_poll_time for m in members), default=None),
+            "mean_wait_time": (
+                sum(member.wait_time for member in members) / polls if polls else None
+            ),
+            "max_wait_time": max((m.max_wait_time for m in members), default=None),
+        }
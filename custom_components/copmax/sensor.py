@@ -1,64 +1,85 @@
 """Platform for CustomIntegration sensor integration."""
 
 from dataclasses import dataclass
-from datetime import timedelta
 import logging
+import time
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfPower, UnitOfTemperature
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from . import CopmaxCoordinator
-from .const import DEFAULT_INVERTER_POLLRATE, DEVICE_MANUCFACTURER, DEVICE_MODEL, DOMAIN
+from .coordinator import CopmaxCoordinator
+from .const import DEADBAND_MAX_AGE, DOMAIN
+from .entity import CopmaxEntity, CopmaxEntityDescription
+from .registers import Register, registers_for
+from .snapshot import derived_value, register_flag, register_value
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=DEFAULT_INVERTER_POLLRATE)
 
-
-@dataclass
-class CustomIntegrationEntityDescription(SensorEntityDescription):
-    """Describes CustomIntegration sensor entity."""
-
-    def __init__(
-        self,
-        key,
-        register: str,
-        type: str,
-        name,
-        icon,
-        device_class,
-        native_unit_of_measurement,
-        format=None,
-    ):
-        super().__init__(key)
-        self.key = key
-        self.register = register
-        self.type = type
-        self.name = name
-        self.icon = icon
-        if device_class is not None:
-            self.device_class = device_class
-        self.native_unit_of_measurement = native_unit_of_measurement
-        self.format = format
+@dataclass(frozen=True, kw_only=True)
+class CopmaxSensorEntityDescription(CopmaxEntityDescription, SensorEntityDescription):
+    """Describes a Copmax sensor."""
+
+    deadband: float | None = None
+    deadband_relative: float | None = None
+
+
+def _description(register: Register) -> CopmaxSensorEntityDescription:
+    """Build the sensor description of a register."""
+    if register.kind == "DERIVED":
+        value = derived_value(register.address)
+    elif register.kind == "STATUS":
+        value = register_flag(register.address)
+    else:
+        value = register_value(register.address, register.divisor)
+
+    return CopmaxSensorEntityDescription(
+        key=register.key,
+        register=register.address,
+        kind=register.kind,
+        value=value,
+        name=register.name,
+        icon=register.icon,
+        device_class=SensorDeviceClass(register.device_class)
+        if register.device_class
+        else None,
+        native_unit_of_measurement=register.unit,
+        state_class=SensorStateClass(register.state_class)
+        if register.state_class
+        else None,
+        deadband=register.deadband,
+        deadband_relative=register.deadband_relative,
+    )
 
 
 async def async_setup_entry(
     hass: HomeAssistant, config: ConfigEntry, async_add_entities
 ):
     """Set up the sensor platform."""
-    copmax = hass.data[DOMAIN][config.entry_id]
-
-    entities: list[CopmaxIntegrationSensor] = [
-        CopmaxIntegrationSensor(copmax._coordinator, sensor, copmax)
-        for sensor in SENSORS_HEATPUMP
-    ]
+    coordinator = hass.data[DOMAIN][config.entry_id]._coordinator
+
+    entities = []
+    for register in registers_for("sensor"):
+        if register.kind != "DERIVED":
+            entity = CopmaxIntegrationSensor
+        elif coordinator.derived is None:
+            continue
+        elif register.address == "cop" and coordinator.power_entity is None:
+            # Without electric power there is no COP to show
+            continue
+        elif register.address == "energy_today":
+            entity = CopmaxDerivedEnergySensor
+        else:
+            entity = CopmaxDerivedSensor
+        entities.append(entity(coordinator, _description(register)))
 
     async_add_entities(entities)
 
@@ -68,294 +89,138 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
     _LOGGER.debug("async_setup_platform")
 
 
-class CopmaxIntegrationSensor(CoordinatorEntity, SensorEntity):
+class CopmaxIntegrationSensor(CopmaxEntity, SensorEntity):
     """Representation of a meter reading sensor."""
 
+    entity_description: CopmaxSensorEntityDescription
+    _unrecorded_attributes = frozenset({"age_seconds", "suppressed_updates"})
+
     def __init__(
         self,
         coordinator: CopmaxCoordinator,
-        sensor: CustomIntegrationEntityDescription,
-        client,
+        description: CopmaxSensorEntityDescription,
     ):
         """Initialize the sensor."""
-        self._data = client
-        self.coordinator = coordinator
-        self.entity_description: CustomIntegrationEntityDescription = sensor
-        self._attr_unique_id = f"{self.coordinator.alias}_{sensor.key}"
-        self._attr_name = f"{self.coordinator.alias} {sensor.name}"
-
-        _LOGGER.info(f"{self.coordinator.alias}: '{self._attr_unique_id}'")
-        self._attr_native_value = None  # Initialize the native value
-        self.suggested_display_precision = 1
+        super().__init__(coordinator, description)
+        self._analog = description.kind == "TEMP"
+        self._last_write = None
+        self._published_at = None
+        self.suppressed_updates = 0
 
-    @property
-    def device_info(self):
-        """Return device information about this entity."""
-
-        return {
-            "identifiers": {(DOMAIN, self.coordinator.alias)},
-            "manufacturer": DEVICE_MANUCFACTURER,
-            "model": DEVICE_MODEL,
-            "name": self.coordinator.alias,
-        }
-
-    @property
-    def should_poll(self):
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if not self._analog:
+            super()._handle_coordinator_update()
+            return
+
+        data = self.coordinator.data
+        register = self.entity_description.register
+        if data is None or not data.is_fresh(register):
+            # The next value is published regardless of the deadband
+            self._published_at = None
+            self.async_write_ha_state()
+            return
+
+        value = self.entity_description.value(data)
+        if not self._deadband_exceeded(value):
+            return
+
+        attributes = {"suppressed_updates": self.suppressed_updates}
+        if self.coordinator.statistics_window:
+            if not self._window_elapsed():
+                return
+            aggregate = self.coordinator.window_aggregate(register)
+            if aggregate is not None:
+                attributes |= {
+                    "min": aggregate[0] / 100,
+                    "mean": round(aggregate[1] / 100, 2),
+                    "max": aggregate[2] / 100,
+                }
+        attributes["age_seconds"] = round(data.age(register))
+
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = attributes
+        self._published_at = time.time()
+        self.async_write_ha_state()
+
+    def _deadband_exceeded(self, value) -> bool:
+        """Check if a new value differs enough from the published one."""
+        description = self.entity_description
+        if (
+            description.deadband is None and description.deadband_relative is None
+        ) or self._attr_native_value is None:
+            return True
+
+        if (
+            self._published_at is None
+            or time.time() - self._published_at >= DEADBAND_MAX_AGE
+        ):
+            return True
+
+        # The options, when set, override the deadbands of the register map
+        deadband = self.coordinator.temp_deadband
+        if deadband is None:
+            deadband = description.deadband
+        relative = self.coordinator.temp_deadband_relative
+        if relative is None:
+            relative = description.deadband_relative
+        band = max(deadband or 0, abs(self._attr_native_value) * (relative or 0))
+
+        if abs(value - self._attr_native_value) > band:
+            return True
+
+        self.suppressed_updates += 1
+        self.coordinator.suppressed_updates += 1
         return False
 
-    @property
-    def friendly_name(self):
-        return self.entity_description.name
+    def _window_elapsed(self) -> bool:
+        """Check if the statistics window has passed since the last write."""
+        now = time.time()
+        if (
+            self._last_write is not None
+            and now - self._last_write < self.coordinator.statistics_window
+        ):
+            return False
 
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        if self._attr_native_value is None:
-            return self._attr_native_value
+        self._last_write = now
+        return True
 
-        if self.entity_description.type == "STATUS":
-            return self._attr_native_value > 0
 
-        return self._attr_native_value / 100
+class CopmaxDerivedSensor(CopmaxEntity, SensorEntity):
+    """Value calculated from the register image, e.g. heat output and COP."""
 
-    async def async_added_to_hass(self):
-        """Handle entity addition to hass."""
-        # Add the coordinator listener for data updates
-        self.coordinator.async_add_listener(self._handle_coordinator_update)
-        # Ensure that data is fetched initially
-        # await self.coordinator.async_refresh()
+    _unrecorded_attributes = frozenset()
+
+    @property
+    def available(self) -> bool:
+        """Available once there is enough data to calculate the value."""
+        return self._attr_native_value is not None
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        data_available = False
-
-        try:
-            # Handle Temperatures
-            if self.entity_description.type == "TEMP":
-                if self.coordinator.copmaxModbusPoll.temperatures_valid:
-                    self._attr_native_value = (
-                        self.coordinator.copmaxModbusPoll.temperatures[
-                            self.entity_description.register
-                        ]
-                    )
-                    data_available = True
-
-            # Handle User settings
-            if self.entity_description.type == "STATUS":
-                if self.coordinator.copmaxModbusPoll.status_valid:
-                    self._attr_native_value = self.coordinator.copmaxModbusPoll.status[
-                        self.entity_description.register
-                    ]
-                    data_available = True
-
-            self._attr_available = data_available
-            self.async_write_ha_state()
-
-        except KeyError as ex:
-            _LOGGER.debug(
-                f"KeyError: {str(ex)} while handling {self.entity_description.key}"
-            )
-        except ValueError as ex:
-            _LOGGER.debug(
-                f"ValueError: {str(ex)} while handling {self.entity_description.key}"
+        """Take the derived value from the new snapshot."""
+        data = self.coordinator.data
+        if data is not None:
+            self._attr_native_value = self.entity_description.value(data)
+        self.async_write_ha_state()
+
+
+class CopmaxDerivedEnergySensor(CopmaxDerivedSensor, RestoreSensor):
+    """Energy of the day, continued from the last state after a restart."""
+
+    async def async_added_to_hass(self) -> None:
+        """Add the energy of the day before the restart to the calculator."""
+        state = await self.async_get_last_state()
+        data = await self.async_get_last_sensor_data()
+        if state is not None and data is not None and data.native_value is not None:
+            self.coordinator.derived.restore_energy(
+                dt_util.as_local(state.last_updated).date(), float(data.native_value)
             )
-        except Exception as ex:
-            _LOGGER.debug(
-                f"Unexpected error: {str(ex)} while handling {self.entity_description.key}"
-            )
-
+        await super().async_added_to_hass()
 
-SENSORS_HEATPUMP: tuple[SensorEntityDescription, ...] = (
-    # Temperatures
-    CustomIntegrationEntityDescription(
-        key="I_RT",
-        register=0,
-        type="TEMP",
-        name="Return Temp",
-        icon="mdi:thermometer-low",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_ST",
-        register=1,
-        type="TEMP",
-        name="Output Temp",
-        icon="mdi:thermometer-high",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_OT",
-        register=2,
-        type="TEMP",
-        name="Outdoor Temp",
-        icon="mdi:home-thermometer-outline",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_HT",
-        register=3,
-        type="TEMP",
-        name="Hot water tank Temp",
-        icon="mdi:thermometer",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_CT",
-        register=4,
-        type="TEMP",
-        name="Condenser Temp",
-        icon="mdi:thermometer",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_ET",
-        register=5,
-        type="TEMP",
-        name="Exhaust gas Temp",
-        icon="mdi:thermometer",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-    ),
-    # Status registers
-    CustomIntegrationEntityDescription(
-        key="I_R6",
-        register=6,
-        type="STATUS",
-        name="Status_I_R6",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R7",
-        register=7,
-        type="STATUS",
-        name="Status_I_R7",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R8",
-        register=8,
-        type="STATUS",
-        name="Status_I_R8",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R9",
-        register=9,
-        type="STATUS",
-        name="Remote run signal",
-        icon="mdi:remote",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R10",
-        register=10,
-        type="STATUS",
-        name="Status_I_R10",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R11",
-        register=11,
-        type="STATUS",
-        name="Comp run",
-        icon="mdi:run",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R12",
-        register=12,
-        type="STATUS",
-        name="Status_I_R12",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R13",
-        register=13,
-        type="STATUS",
-        name="Circ. pump",
-        icon="mdi:pump",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R14",
-        register=14,
-        type="STATUS",
-        name="Status_I_R14",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R15",
-        register=15,
-        type="STATUS",
-        name="Status_I_R15",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R16",
-        register=16,
-        type="STATUS",
-        name="Status_I_R16",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R17",
-        register=17,
-        type="STATUS",
-        name="Status_I_R17",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R18",
-        register=18,
-        type="STATUS",
-        name="Status_I_R18",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R19",
-        register=19,
-        type="STATUS",
-        name="Status_I_R19",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-    CustomIntegrationEntityDescription(
-        key="I_R20",
-        register=20,
-        type="STATUS",
-        name="Status_I_R20",
-        icon="mdi:information",
-        device_class=None,
-        native_unit_of_measurement=None,
-    ),
-)
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Take the running total, which includes the restored energy."""
+        self._attr_native_value = self.coordinator.derived.energy_today
+        self.async_write_ha_state()
@@ -0,0 +1,92 @@
+"""Services of the Copmax integration."""
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import (
+    DOMAIN,
+    SERVICE_PROBE_CAPABILITIES,
+    SERVICE_SET_SCHEDULE,
+    SERVICE_START_CAPTURE,
+    SERVICE_STOP_CAPTURE,
+)
+from .schedule import WEEKDAYS
+
+PROBE_CAPABILITIES_SCHEMA = vol.Schema({vol.Optional("entry_id"): cv.string})
+
+SET_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entry_id"): cv.string,
+        vol.Required("slots"): [
+            {
+                vol.Required("start"): cv.string,
+                vol.Optional("days"): [vol.In(WEEKDAYS)],
+                vol.Required("registers"): {cv.string: vol.Coerce(float)},
+            }
+        ],
+    }
+)
+
+
+def _coordinators(hass: HomeAssistant):
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        copmax = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if copmax is not None:
+            yield copmax._coordinator
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services, once for all entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_START_CAPTURE):
+        return
+
+    async def async_start_capture(call: ServiceCall) -> None:
+        """Record the bus traffic of every heat pump to the config directory."""
+        started = dt_util.now().strftime("%Y%m%d_%H%M%S")
+        for coordinator in _coordinators(hass):
+            await coordinator.async_start_capture(
+                hass.config.path(
+                    f"copmax_capture_{slugify(coordinator.alias)}_{started}.jsonl.gz"
+                )
+            )
+
+    async def async_stop_capture(call: ServiceCall) -> None:
+        for coordinator in _coordinators(hass):
+            await coordinator.async_stop_capture()
+
+    async def async_set_schedule(call: ServiceCall) -> None:
+        """Replace the schedule of one heat pump, or of all without entry_id."""
+        entry_id = call.data.get("entry_id")
+        for coordinator in _coordinators(hass):
+            if entry_id in (None, coordinator.config_entry.entry_id):
+                try:
+                    await coordinator.async_set_schedule(call.data["slots"])
+                except ValueError as ex:
+                    raise ServiceValidationError(str(ex)) from ex
+
+    async def async_probe_capabilities(call: ServiceCall) -> None:
+        """Probe the request shapes again, e.g. after a firmware or gateway change."""
+        entry_id = call.data.get("entry_id")
+        for coordinator in _coordinators(hass):
+            if entry_id in (None, coordinator.config_entry.entry_id):
+                try:
+                    await coordinator.async_probe_capabilities()
+                except ConnectionError as ex:
+                    raise HomeAssistantError(str(ex)) from ex
+
+    hass.services.async_register(DOMAIN, SERVICE_START_CAPTURE, async_start_capture)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_CAPTURE, async_stop_capture)
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_SCHEDULE, async_set_schedule, SET_SCHEDULE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROBE_CAPABILITIES,
+        async_probe_capabilities,
+        PROBE_CAPABILITIES_SCHEMA,
+    )
@@ -0,0 +1,84 @@
+"""Immutable register image handed from the coordinator to the entities."""
+
+from operator import itemgetter
+from types import MappingProxyType
+import time
+
+
+class CopmaxSnapshot:
+    """The register image after one poll cycle.
+
+    Built once per cycle by the poller and never changed afterwards, so the
+    entities can read it while the next poll is already filling the image.
+    """
+
+    __slots__ = (
+        "time",
+        "registers",
+        "timestamps",
+        "updated",
+        "changed",
+        "derived",
+        "_max_ages",
+    )
+
+    def __init__(
+        self,
+        registers: dict,
+        timestamps: dict,
+        updated,
+        changed,
+        derived: dict,
+        max_ages: dict,
+    ):
+        setattr_ = super().__setattr__
+        setattr_("time", time.time())
+        setattr_("registers", MappingProxyType(registers))
+        setattr_("timestamps", MappingProxyType(timestamps))
+        setattr_("updated", frozenset(updated))
+        setattr_("changed", frozenset(changed))
+        setattr_("derived", MappingProxyType(derived))
+        setattr_("_max_ages", max_ages)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def age(self, address: int) -> float | None:
+        """Seconds since the register was read, None if it never was."""
+        timestamp = self.timestamps.get(address)
+        if timestamp is None:
+            return None
+        return time.time() - timestamp
+
+    def is_fresh(self, address: int) -> bool:
+        """Check if the register is within the max age of its poll group."""
+        age = self.age(address)
+        return age is not None and age <= self._max_ages[address]
+
+
+def register_value(register: int, divisor: int = 1):
+    """Build a getter for the scaled value of a register in a snapshot.
+
+    Signedness is handled by the poll group when the register is read, so the
+    getter is only an indexed lookup and a division.
+    """
+    get = itemgetter(register)
+    if divisor == 1:
+        return lambda data: get(data.registers)
+    return lambda data: get(data.registers) / divisor
+
+
+def register_flag(register: int):
+    """Build a getter for a register read as on/off."""
+    get = itemgetter(register)
+    return lambda data: get(data.registers) != 0
+
+
+def derived_value(name: str, digits: int = 3):
+    """Build a getter for a derived value, rounded for display."""
+
+    def get(data):
+        value = data.derived.get(name)
+        return None if value is None else round(value, digits)
+
+    return get
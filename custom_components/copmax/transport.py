@@ -0,0 +1,119 @@
+"""Modbus clients for the different ways of reaching the RS-485 bus.
+
+pymodbus is imported only here and only for the transport in use, it is by far
+the largest import of the integration.
+"""
+
+import struct
+
+from .const import (
+    DEFAULT_BAUDRATE,
+    TRANSPORT_RTU_OVER_TCP,
+    TRANSPORT_SERIAL,
+    TRANSPORT_TCP,
+)
+
+
+def client_class(transport: str):
+    """Import and return the client class of a transport."""
+    if transport == TRANSPORT_TCP:
+        from pymodbus.client import AsyncModbusTcpClient
+
+        return _without_writes(AsyncModbusTcpClient)
+
+    if transport == TRANSPORT_RTU_OVER_TCP:
+        from .rtu import CopmaxRtuClient
+
+        return CopmaxRtuClient
+
+    if transport == TRANSPORT_SERIAL:
+        from pymodbus.client import AsyncModbusSerialClient
+
+        return _without_writes(AsyncModbusSerialClient)
+
+    raise ValueError(f"Unknown transport '{transport}'")
+
+
+def _without_writes(base):
+    """Let readwrite_registers of a pymodbus client send no values.
+
+    pymodbus does not encode a read/write multiple request that writes no
+    register. The capability probe needs exactly that request: the heat pump
+    has to reject the quantity of 0, so nothing is written even if it
+    implements the function. CopmaxRtuClient sends it as it is.
+    """
+    from pymodbus.pdu.register_message import ReadWriteMultipleRegistersRequest
+
+    class ReadWithoutWriteRequest(ReadWriteMultipleRegistersRequest):
+        def encode(self) -> bytes:
+            return struct.pack(
+                ">HHHHB", self.read_address, self.read_count, self.write_address, 0, 0
+            )
+
+    class Client(base):
+        def readwrite_registers(
+            self,
+            *,
+            read_address: int = 0,
+            read_count: int = 0,
+            write_address: int = 0,
+            values=None,
+            device_id: int = 1,
+            **kwargs,
+        ):
+            if values:
+                return super().readwrite_registers(
+                    read_address=read_address,
+                    read_count=read_count,
+                    write_address=write_address,
+                    values=values,
+                    device_id=device_id,
+                    **kwargs,
+                )
+            return self.execute(
+                False,
+                ReadWithoutWriteRequest(
+                    read_address=read_address,
+                    read_count=read_count,
+                    write_address=write_address,
+                    dev_id=device_id,
+                ),
+            )
+
+    Client.__name__ = base.__name__
+    return Client
+
+
+def create_client(
+    transport: str,
+    host: str,
+    port: int,
+    timeout: float,
+    baudrate: int = DEFAULT_BAUDRATE,
+):
+    """Create the pymodbus client for a transport.
+
+    All transports return a client with the same async read/write API, so the
+    poller applies the same pacing and batching to every one of them.
+    """
+    client = client_class(transport)
+
+    if transport == TRANSPORT_TCP:
+        return client(host, port=port, timeout=timeout)
+
+    if transport == TRANSPORT_RTU_OVER_TCP:
+        # Framing is done here rather than in pymodbus, see CopmaxRtuClient
+        return client(host, port, timeout, baudrate)
+
+    from pymodbus import FramerType
+
+    # The controller is running 9600,8,N,1
+    return client(
+        host,
+        framer=FramerType.RTU,
+        baudrate=baudrate,
+        bytesize=8,
+        parity="N",
+        stopbits=1,
+        timeout=timeout,
+    )
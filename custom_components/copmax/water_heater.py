@@ -0,0 +1,122 @@
+"""Hot water of the heat pump as one water heater entity."""
+
+from dataclasses import dataclass
+import logging
+
+from homeassistant.components.water_heater import (
+    ATTR_OPERATION_MODE,
+    STATE_HEAT_PUMP,
+    WaterHeaterEntity,
+    WaterHeaterEntityEntityDescription,
+    WaterHeaterEntityFeature,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_TEMPERATURE, STATE_OFF, UnitOfTemperature
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .entity import CopmaxEntity, CopmaxEntityDescription
+from .registers import register_by_key
+from .snapshot import register_flag, register_value
+
+_LOGGER = logging.getLogger(__name__)
+
+# Hot water target, tank temperature and the hot water switch
+TARGET = register_by_key("H_ST09")
+CURRENT = register_by_key("I_HT")
+ENABLED = register_by_key("H_SF13")
+
+
+@dataclass(frozen=True, kw_only=True)
+class CopmaxWaterHeaterEntityDescription(
+    CopmaxEntityDescription, WaterHeaterEntityEntityDescription
+):
+    """Describes the Copmax water heater."""
+
+
+def _value():
+    current = register_value(CURRENT.address, CURRENT.divisor)
+    target = register_value(TARGET.address, TARGET.divisor)
+    enabled = register_flag(ENABLED.address)
+    return lambda data: (current(data), target(data), enabled(data))
+
+
+DESCRIPTION = CopmaxWaterHeaterEntityDescription(
+    key="WATER_HEATER",
+    register=TARGET.address,
+    registers=(CURRENT.address, ENABLED.address),
+    kind="HOT_WATER",
+    value=_value(),
+    name="Hot water heater",
+    icon="mdi:water-boiler",
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, config: ConfigEntry, async_add_entities
+):
+    """Set up the water heater platform."""
+    coordinator = hass.data[DOMAIN][config.entry_id]._coordinator
+
+    async_add_entities([CopmaxWaterHeater(coordinator, DESCRIPTION)])
+
+
+class CopmaxWaterHeater(CopmaxEntity, WaterHeaterEntity):
+    """Hot water target and on/off of the heat pump.
+
+    A new target and operation mode from one service call are written as one
+    batch through the coordinator.
+    """
+
+    entity_description: CopmaxWaterHeaterEntityDescription
+    _attr_temperature_unit = UnitOfTemperature.CELSIUS
+    _attr_min_temp = TARGET.minimum
+    _attr_max_temp = TARGET.maximum
+    _attr_target_temperature_step = TARGET.step
+    _attr_operation_list = [STATE_OFF, STATE_HEAT_PUMP]
+    _attr_supported_features = (
+        WaterHeaterEntityFeature.TARGET_TEMPERATURE
+        | WaterHeaterEntityFeature.OPERATION_MODE
+        | WaterHeaterEntityFeature.ON_OFF
+    )
+
+    def _set_value(self, value) -> None:
+        current, target, enabled = value
+        self._attr_current_temperature = current
+        self._attr_target_temperature = target
+        self._attr_current_operation = STATE_HEAT_PUMP if enabled else STATE_OFF
+
+    async def async_set_temperature(self, **kwargs) -> None:
+        """Set the target, and the operation mode when given with it."""
+        values = {}
+        if (temperature := kwargs.get(ATTR_TEMPERATURE)) is not None:
+            values[TARGET.address] = round(temperature * TARGET.divisor)
+        if (operation_mode := kwargs.get(ATTR_OPERATION_MODE)) is not None:
+            values[ENABLED.address] = int(operation_mode != STATE_OFF)
+        await self._write(values)
+
+    async def async_set_operation_mode(self, operation_mode: str) -> None:
+        await self._write({ENABLED.address: int(operation_mode != STATE_OFF)})
+
+    async def async_turn_on(self, **kwargs) -> None:
+        await self.async_set_operation_mode(STATE_HEAT_PUMP)
+
+    async def async_turn_off(self, **kwargs) -> None:
+        await self.async_set_operation_mode(STATE_OFF)
+
+    async def _write(self, values: dict) -> None:
+        """Write the registers and show the new state until the next poll."""
+        if not values:
+            return
+        _LOGGER.info(f"Sending {values} to device...")
+        if not await self.coordinator.async_write_registers(values):
+            _LOGGER.error(f"Writing {values} to '{self.coordinator.alias}' failed")
+            return
+
+        if TARGET.address in values:
+            self._attr_target_temperature = values[TARGET.address] / TARGET.divisor
+        if ENABLED.address in values:
+            self._attr_current_operation = (
+                STATE_HEAT_PUMP if values[ENABLED.address] else STATE_OFF
+            )
+        self.async_write_ha_state()
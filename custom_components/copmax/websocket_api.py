@@ -0,0 +1,120 @@
+"""WebSocket commands serving the register image to dashboard cards.
+
+One subscription carries all registers of a heat pump, instead of a
+state_changed event per entity. Everything is answered from the latest
+snapshot of the coordinator, nothing is read from the bus.
+"""
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .snapshot import CopmaxSnapshot
+
+
+def _snapshot_message(data: CopmaxSnapshot) -> dict:
+    return {
+        "time": data.time,
+        "registers": dict(data.registers),
+        "ages": {
+            address: round(age, 1)
+            for address in data.registers
+            if (age := data.age(address)) is not None
+        },
+        "stale": [address for address in data.registers if not data.is_fresh(address)],
+        "derived": dict(data.derived),
+    }
+
+
+def _delta_message(previous: CopmaxSnapshot, data: CopmaxSnapshot) -> dict:
+    message = {
+        "time": data.time,
+        "registers": {
+            address: value
+            for address, value in data.registers.items()
+            if previous.registers.get(address) != value
+        },
+    }
+    stale = [address for address in data.registers if not data.is_fresh(address)]
+    if stale:
+        message["stale"] = stale
+    if data.derived != previous.derived:
+        message["derived"] = dict(data.derived)
+    return message
+
+
+def _coordinator(hass: HomeAssistant, connection, msg):
+    copmax = hass.data.get(DOMAIN, {}).get(msg["entry_id"])
+    if copmax is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Config entry not loaded"
+        )
+        return None
+    return copmax._coordinator
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): "copmax/get_snapshot", vol.Required("entry_id"): str}
+)
+@callback
+def ws_get_snapshot(hass: HomeAssistant, connection, msg) -> None:
+    """Return all registers of the latest poll, with their age."""
+    coordinator = _coordinator(hass, connection, msg)
+    if coordinator is None:
+        return
+    if coordinator.data is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "No data yet")
+        return
+    connection.send_result(msg["id"], _snapshot_message(coordinator.data))
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "copmax/subscribe_registers",
+        vol.Required("entry_id"): str,
+    }
+)
+@callback
+def ws_subscribe_registers(hass: HomeAssistant, connection, msg) -> None:
+    """Send the full snapshot, then only the changed registers of every poll.
+
+    A failed poll is sent as {"success": false}, the next successful poll
+    sends the changes since the last snapshot that was sent.
+    """
+    coordinator = _coordinator(hass, connection, msg)
+    if coordinator is None:
+        return
+
+    sent = None
+
+    @callback
+    def forward() -> None:
+        nonlocal sent
+        data = coordinator.data
+        if not coordinator.last_update_success:
+            connection.send_message(
+                websocket_api.event_message(msg["id"], {"success": False})
+            )
+            return
+        if data is None or data is sent:
+            return
+
+        if sent is None:
+            message = _snapshot_message(data)
+        else:
+            message = _delta_message(sent, data)
+        sent = data
+        connection.send_message(websocket_api.event_message(msg["id"], message))
+
+    connection.subscriptions[msg["id"]] = coordinator.async_add_listener(forward)
+    connection.send_result(msg["id"])
+    forward()
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the commands, once for all entries."""
+    websocket_api.async_register_command(hass, ws_get_snapshot)
+    websocket_api.async_register_command(hass, ws_subscribe_registers)
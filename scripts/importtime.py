@@ -0,0 +1,93 @@
+"""Import time of the integration, measured with python -X importtime.
+
+Every module is imported in a fresh interpreter, after the Home Assistant
+modules a running instance has loaded anyway, so only the cost added by the
+integration is counted. Run from the root of the repository:
+
+    python scripts/importtime.py
+    python scripts/importtime.py --runs 9 custom_components.copmax.sensor
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "custom_components.copmax",
+    "custom_components.copmax.coordinator",
+    "custom_components.copmax.sensor",
+    "custom_components.copmax.number",
+    "custom_components.copmax.switch",
+    "custom_components.copmax.climate",
+    "custom_components.copmax.water_heater",
+    "custom_components.copmax.config_flow",
+    "custom_components.copmax.transport",
+]
+
+# Loaded by Home Assistant before any custom integration
+PRELOAD = [
+    "asyncio",
+    "voluptuous",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.entity",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.sensor",
+    "homeassistant.components.number",
+    "homeassistant.components.switch",
+]
+
+MARKER = "-- copmax --"
+
+
+def _measure(module: str) -> tuple[int, list[tuple[int, str]]]:
+    """Import a module once, return its cumulative time and the nested imports."""
+    code = (
+        "import importlib, sys\n"
+        f"for name in {PRELOAD!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except ImportError:\n"
+        "        pass\n"
+        f"print({MARKER!r}, file=sys.stderr, flush=True)\n"
+        f"import {module}\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stderr.split(MARKER, 1)[1].splitlines()
+
+    total = 0
+    nested = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if name.strip() == module and not name.startswith("  "):
+            total = int(cumulative_us)
+        nested.append((int(self_us), name.strip()))
+    return total, nested
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--runs", type=int, default=5, help="median of this many")
+    parser.add_argument("--top", type=int, default=5, help="slowest nested imports")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        runs = [_measure(module) for _ in range(args.runs)]
+        total = statistics.median(run[0] for run in runs)
+        print(f"{module:45} {total / 1000:8.1f} ms")
+        for self_us, name in sorted(runs[-1][1], reverse=True)[: args.top]:
+            if name != module:
+                print(f"    {name:41} {self_us / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
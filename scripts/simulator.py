@@ -0,0 +1,100 @@
+"""Local Copmax heat pump simulator for development without a heat pump.
+
+Serves the input registers 0-20 and holding registers 24-56 with plausible
+values and a little jitter on the temperatures.
+
+    python scripts/simulator.py --transport tcp --port 5020
+    python scripts/simulator.py --transport rtu_over_tcp --port 5020
+    python scripts/simulator.py --transport serial
+
+With the serial transport a linked pty pair is created, the simulator serves
+one end and the path of the other end is printed for the integration to use.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tty
+
+from pymodbus import FramerType
+from pymodbus.datastore import (
+    ModbusDeviceContext,
+    ModbusSequentialDataBlock,
+    ModbusServerContext,
+)
+from pymodbus.server import StartAsyncSerialServer, StartAsyncTcpServer
+
+# Temperatures in hundredths of a degree, followed by the status registers
+INPUT_REGISTERS = [3000, 3500, 500, 4800, 4000, 6000] + [0, 0, 0, 1, 0, 1, 0, 1] + [0] * 7
+
+# Special functions 24-37 followed by user settings 38-56
+HOLDING_REGISTERS = [0] * 24 + [
+    0, 0, 200, 0, 0, 5, 0, 2, 2, 0, 3000, 500, 1, 0,
+    2200, 3500, 200, 300, 1000, 5, 500, 500, 5000, 500,
+    1800, 2500, 2000, 5500, 500, 1000, 100, 500, 500,
+]
+
+
+def _pty_pair():
+    """Create two linked ptys, like socat, and return their paths."""
+    master_a, slave_a = os.openpty()
+    master_b, slave_b = os.openpty()
+    for fd in (slave_a, slave_b):
+        tty.setraw(fd)
+
+    loop = asyncio.get_running_loop()
+
+    def forward(source, destination):
+        try:
+            os.write(destination, os.read(source, 256))
+        except OSError:
+            pass
+
+    loop.add_reader(master_a, forward, master_a, master_b)
+    loop.add_reader(master_b, forward, master_b, master_a)
+    return os.ttyname(slave_a), os.ttyname(slave_b)
+
+
+async def _jitter(device: ModbusDeviceContext):
+    """Let the temperatures wander a little, like the real sensors."""
+    while True:
+        await asyncio.sleep(1)
+        values = device.getValues(4, 0, 6)
+        values = [value + random.randint(-3, 3) for value in values]
+        device.setValues(4, 0, values)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--transport", choices=["tcp", "rtu_over_tcp", "serial"], default="tcp"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5020)
+    args = parser.parse_args()
+
+    # pymodbus addresses the data blocks from 1
+    device = ModbusDeviceContext(
+        ir=ModbusSequentialDataBlock(1, INPUT_REGISTERS),
+        hr=ModbusSequentialDataBlock(1, HOLDING_REGISTERS),
+    )
+    context = ModbusServerContext(devices=device, single=True)
+    asyncio.create_task(_jitter(device))
+
+    if args.transport == "serial":
+        server_end, client_end = _pty_pair()
+        print(f"Serial simulator, connect the integration to {client_end}")
+        await StartAsyncSerialServer(
+            context=context, port=server_end, framer=FramerType.RTU, baudrate=9600
+        )
+    else:
+        framer = FramerType.RTU if args.transport == "rtu_over_tcp" else FramerType.SOCKET
+        print(f"{args.transport} simulator on {args.host}:{args.port}")
+        await StartAsyncTcpServer(
+            context=context, address=(args.host, args.port), framer=framer
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
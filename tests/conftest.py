@@ -0,0 +1,6 @@
+"""Make the integration importable as custom_components.copmax."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,66 @@
+"""Tests of the circuit breaker transitions."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.copmax import breaker
+from custom_components.copmax.breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(breaker, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def test_opens_after_threshold(clock):
+    circuit = CircuitBreaker(threshold=3, base_backoff=30, max_backoff=600)
+
+    circuit.record_failure()
+    circuit.record_failure()
+    assert circuit.state == STATE_CLOSED
+    assert circuit.allow_request()
+
+    circuit.record_failure()
+    assert circuit.state == STATE_OPEN
+    assert circuit.trips == 1
+    assert not circuit.allow_request()
+
+
+def test_half_open_after_backoff_and_close(clock):
+    circuit = CircuitBreaker(threshold=1, base_backoff=30, max_backoff=600)
+    circuit.record_failure()
+
+    clock.now += 29
+    assert not circuit.allow_request()
+    clock.now += 1
+    assert circuit.allow_request()
+    assert circuit.state == STATE_HALF_OPEN
+
+    circuit.record_success()
+    assert circuit.state == STATE_CLOSED
+    assert circuit.recoveries == 1
+    assert circuit.last_outage == 30
+    assert circuit.backoff == 30
+
+
+def test_failed_probe_doubles_backoff_up_to_max(clock):
+    circuit = CircuitBreaker(threshold=1, base_backoff=30, max_backoff=100)
+    circuit.record_failure()
+
+    for backoff in (60, 100, 100):
+        clock.now = circuit.retry_at
+        assert circuit.allow_request()
+        circuit.record_failure()
+        assert circuit.state == STATE_OPEN
+        assert circuit.backoff == backoff
+        assert circuit.retry_at == clock.now + backoff
+
+    assert circuit.trips == 1
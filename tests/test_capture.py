@@ -0,0 +1,83 @@
+"""Tests of recording a capture and replaying it."""
+
+import asyncio
+
+from pymodbus.exceptions import ModbusIOException
+import pytest
+
+from custom_components.copmax.capture import (
+    CaptureRecorder,
+    CaptureWriter,
+    ReplayClient,
+    load_capture,
+)
+from custom_components.copmax.const import INPUT_REGISTER_CODE
+from custom_components.copmax.rtu import RtuResponse
+
+
+class FakeClient:
+    """Answers the first read, rejects the second and loses the third."""
+
+    connected = False
+
+    def __init__(self):
+        self.answers = [
+            RtuResponse(INPUT_REGISTER_CODE, [2100, 2050]),
+            RtuResponse(INPUT_REGISTER_CODE, exception_code=2),
+            ModbusIOException("No answer"),
+        ]
+
+    async def connect(self):
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+    async def read_input_registers(self, address, count=1, device_id=1):
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            self.connected = False
+            raise answer
+        return answer
+
+
+async def _record(path):
+    writer = CaptureWriter(path, "gateway", 0.05)
+    client = CaptureRecorder(FakeClient(), writer)
+    await client.connect()
+    await client.read_input_registers(0, count=2)
+    await client.read_input_registers(20, count=1)
+    with pytest.raises(ModbusIOException):
+        await client.read_input_registers(0, count=2)
+    writer.close()
+
+
+def test_replay_returns_the_recorded_answers(tmp_path):
+    path = str(tmp_path / "capture.jsonl.gz")
+    asyncio.run(_record(path))
+
+    header, requests = load_capture(path)
+    assert header["host"] == "gateway"
+    assert header["frame_delay"] == 0.05
+    assert len(requests) == 4
+
+    async def replay():
+        client = ReplayClient(requests, time_scale=0)
+        assert await client.connect()
+        assert (await client.read_input_registers(0, count=2)).registers == [
+            2100,
+            2050,
+        ]
+        assert (await client.read_input_registers(20, count=1)).exception_code == 2
+        with pytest.raises(ModbusIOException, match="No answer"):
+            await client.read_input_registers(0, count=2)
+        assert not client.connected
+        assert client.remaining == 0
+
+        # Not recorded, answered from the registers seen so far
+        response = await client.read_input_registers(1, count=1)
+        assert response.registers == [2050]
+        assert client.unmatched == 1
+
+    asyncio.run(replay())
@@ -0,0 +1,89 @@
+"""Tests of the request deadlines learned from the round trips."""
+
+import pytest
+
+from custom_components.copmax.const import (
+    DEADLINE_MIN_MARGIN,
+    DEADLINE_MIN_SAMPLES,
+    HOLDING_REGISTER_CODE,
+    INPUT_REGISTER_CODE,
+    READ_WRITE_MULTIPLE_CODE,
+    WRITE_MULTIPLE_CODE,
+    WRITE_REGISTER_CODE,
+)
+from custom_components.copmax.deadline import RequestDeadline, frame_bytes
+
+OVERHEAD = 0.2
+
+
+def _learned(timeout=3.0):
+    deadline = RequestDeadline(9600, timeout)
+    rtt = deadline.frame_time(INPUT_REGISTER_CODE, 6) + OVERHEAD
+    for _ in range(DEADLINE_MIN_SAMPLES):
+        deadline.record(INPUT_REGISTER_CODE, 6, rtt)
+    return deadline
+
+
+def test_frame_bytes():
+    assert frame_bytes(INPUT_REGISTER_CODE, 6) == 25
+    assert frame_bytes(HOLDING_REGISTER_CODE, 1) == 15
+    assert frame_bytes(WRITE_REGISTER_CODE, 1) == 16
+    assert frame_bytes(WRITE_MULTIPLE_CODE, 2) == 21
+    assert frame_bytes(READ_WRITE_MULTIPLE_CODE, 1) == 22
+    with pytest.raises(ValueError):
+        frame_bytes(0x2B, 1)
+
+
+def test_timeout_until_enough_samples():
+    deadline = RequestDeadline(9600, 3.0)
+    for _ in range(DEADLINE_MIN_SAMPLES - 1):
+        deadline.record(INPUT_REGISTER_CODE, 6, 0.1)
+
+    assert deadline.deadline(INPUT_REGISTER_CODE, 6) == 3.0
+
+    deadline.record(INPUT_REGISTER_CODE, 6, 0.1)
+    assert deadline.deadline(INPUT_REGISTER_CODE, 6) < 3.0
+
+
+def test_deadline_from_frame_time_and_overhead():
+    deadline = _learned()
+
+    expected = deadline.frame_time(INPUT_REGISTER_CODE, 6) + 2 * OVERHEAD
+    assert deadline.deadline(INPUT_REGISTER_CODE, 6) == pytest.approx(expected)
+    # Longer reads take longer on the bus
+    assert deadline.deadline(INPUT_REGISTER_CODE, 19) > expected
+
+
+def test_minimum_margin():
+    deadline = RequestDeadline(9600, 3.0)
+    rtt = deadline.frame_time(INPUT_REGISTER_CODE, 6)
+    for _ in range(DEADLINE_MIN_SAMPLES):
+        deadline.record(INPUT_REGISTER_CODE, 6, rtt)
+
+    assert deadline.deadline(INPUT_REGISTER_CODE, 6) == pytest.approx(
+        rtt + DEADLINE_MIN_MARGIN
+    )
+
+
+def test_misses_double_until_the_next_answer():
+    deadline = _learned()
+    learned = deadline.deadline(INPUT_REGISTER_CODE, 6)
+
+    deadline.record_miss()
+    assert deadline.deadline(INPUT_REGISTER_CODE, 6) == pytest.approx(2 * learned)
+    deadline.record_miss()
+    assert deadline.deadline(INPUT_REGISTER_CODE, 6) == pytest.approx(4 * learned)
+    assert deadline.missed == 2
+
+    rtt = deadline.frame_time(INPUT_REGISTER_CODE, 6) + OVERHEAD
+    deadline.record(INPUT_REGISTER_CODE, 6, rtt)
+    assert deadline.deadline(INPUT_REGISTER_CODE, 6) == pytest.approx(learned)
+
+
+def test_timeout_is_the_upper_limit():
+    deadline = _learned(timeout=1.0)
+
+    for _ in range(5):
+        deadline.record_miss()
+
+    assert deadline.deadline(INPUT_REGISTER_CODE, 6) == 1.0
@@ -0,0 +1,58 @@
+"""Tests of the derived heat output, COP and daily energy."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.copmax.derived import CopmaxDerivedValues
+
+START = datetime(2024, 5, 1, 12, 0)
+
+
+def test_energy_is_integrated_between_polls():
+    # 60 l/min is 1 kg/s, 5 K difference is 20930 W
+    derived = CopmaxDerivedValues(60)
+    derived.update(START, 30.0, 35.0)
+    derived.update(START + timedelta(seconds=60), 30.0, 35.0)
+
+    assert derived.heat_power == 20930
+    assert derived.energy_today == pytest.approx(20930 * 60 / 3600000)
+    # No electric power, no COP
+    assert derived.cop is None
+
+
+def test_long_gap_is_not_integrated_and_day_resets():
+    derived = CopmaxDerivedValues(60)
+    derived.update(START, 30.0, 35.0)
+    derived.update(START + timedelta(hours=1), 30.0, 35.0)
+    assert derived.energy_today == 0
+
+    derived.update(START + timedelta(hours=1, seconds=60), 30.0, 35.0)
+    assert derived.energy_today > 0
+    derived.update(START.replace(hour=0) + timedelta(days=1), 30.0, 35.0)
+    assert derived.energy_today == 0
+
+
+def test_cop_over_the_window():
+    derived = CopmaxDerivedValues(60, cop_window=120)
+    for second in range(0, 181, 60):
+        derived.update(START + timedelta(seconds=second), 30.0, 35.0, 5000.0)
+    assert derived.cop == pytest.approx(20930 / 5000, abs=0.01)
+
+    # The old intervals age out of the window
+    for second in range(240, 481, 60):
+        derived.update(START + timedelta(seconds=second), 30.0, 35.0, 10000.0)
+    assert derived.cop == pytest.approx(20930 / 10000, abs=0.01)
+
+
+def test_restored_energy_of_the_same_day_is_continued():
+    derived = CopmaxDerivedValues(60)
+    derived.restore_energy(START.date(), 2.5)
+    derived.update(START, 30.0, 35.0)
+    derived.update(START + timedelta(seconds=60), 30.0, 35.0)
+    assert derived.energy_today == pytest.approx(2.5 + 20930 * 60 / 3600000)
+
+    stale = CopmaxDerivedValues(60)
+    stale.update(START, 30.0, 35.0)
+    stale.restore_energy(START.date() - timedelta(days=1), 2.5)
+    assert stale.energy_today == 0
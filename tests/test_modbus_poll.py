@@ -0,0 +1,186 @@
+"""Tests of the salvage of reads that do not answer."""
+
+import asyncio
+
+from custom_components.copmax.const import (
+    BAD_REGISTER_LIMIT,
+    BISECT_BUDGET,
+    HOLDING_REGISTER_CODE,
+    INPUT_REGISTER_CODE,
+)
+from custom_components.copmax.modbus_poll import CopmaxModbusPoll
+from custom_components.copmax.rtu import RtuResponse
+
+BAD = 3
+
+
+class FakeClient:
+    """Answers every read with the address as value, except around BAD."""
+
+    connected = True
+
+    def __init__(self):
+        self.reads = []
+
+    async def connect(self):
+        return True
+
+    def close(self):
+        pass
+
+    async def read_input_registers(self, address, count=1, device_id=1):
+        self.reads.append((address, count))
+        if address <= BAD < address + count:
+            return RtuResponse(INPUT_REGISTER_CODE, exception_code=2)
+        return RtuResponse(INPUT_REGISTER_CODE, list(range(address, address + count)))
+
+
+def _poll():
+    poll = CopmaxModbusPoll("gateway", 502, client=FakeClient())
+    poll.frame_delay = 0
+    poll.retries = 0
+    return poll
+
+
+def test_salvage_keeps_the_registers_that_answer():
+    poll = _poll()
+
+    values, _ = asyncio.run(
+        poll._read_salvage(INPUT_REGISTER_CODE, 0, 6, BISECT_BUDGET)
+    )
+
+    assert values == {0: 0, 1: 1, 2: 2, 4: 4, 5: 5}
+    assert poll.register_failures == {(INPUT_REGISTER_CODE, BAD): 1}
+    assert not poll.excluded_registers
+
+
+def test_failing_register_is_excluded_from_the_plan():
+    poll = _poll()
+
+    for _ in range(BAD_REGISTER_LIMIT):
+        asyncio.run(poll._read_salvage(INPUT_REGISTER_CODE, 0, 6, BISECT_BUDGET))
+
+    assert (INPUT_REGISTER_CODE, BAD) in poll.excluded_registers
+    # Read around it, the excluded register is not retried yet
+    assert list(poll._plan(INPUT_REGISTER_CODE, 0, 6)) == [(0, 3), (4, 2)]
+
+
+def test_excluded_register_comes_back():
+    poll = _poll()
+    poll.excluded_registers[(INPUT_REGISTER_CODE, 5)] = 0.0
+    poll.register_failures[(INPUT_REGISTER_CODE, 5)] = BAD_REGISTER_LIMIT
+
+    plan = list(poll._plan(INPUT_REGISTER_CODE, 4, 2))
+    assert plan == [(4, 1), (5, 1)]
+
+    values, _ = asyncio.run(
+        poll._read_salvage(INPUT_REGISTER_CODE, 5, 1, BISECT_BUDGET)
+    )
+
+    assert values == {5: 5}
+    assert not poll.excluded_registers
+    assert not poll.register_failures
+
+
+def test_merged_read_clears_the_failures():
+    poll = _poll()
+    poll.register_failures[(INPUT_REGISTER_CODE, 5)] = BAD_REGISTER_LIMIT - 1
+
+    values, _ = asyncio.run(
+        poll._read_salvage(INPUT_REGISTER_CODE, 4, 2, BISECT_BUDGET)
+    )
+
+    assert values == {4: 4, 5: 5}
+    assert not poll.register_failures
+
+
+
+class DroppingClient(FakeClient):
+    """Never answers the first read of the temperatures, like a lost frame."""
+
+    def __init__(self):
+        super().__init__()
+        self.connected = True
+        self.dropped = False
+
+    async def connect(self):
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+    async def read_input_registers(self, address, count=1, device_id=1):
+        if (address, count) == (0, 6) and not self.dropped:
+            self.dropped = True
+            await asyncio.sleep(10)
+        return RtuResponse(INPUT_REGISTER_CODE, list(range(address, address + count)))
+
+    async def read_holding_registers(self, address, count=1, device_id=1):
+        return RtuResponse(HOLDING_REGISTER_CODE, list(range(address, address + count)))
+
+
+def test_missed_deadline_does_not_end_the_poll():
+    client = DroppingClient()
+    poll = CopmaxModbusPoll("gateway", 502, client=client)
+    poll.frame_delay = 0
+    poll.retries = 0
+    poll.deadline.timeout = 0.05
+
+    assert asyncio.run(poll.poll_heat_pump_data())
+
+    assert client.dropped
+    assert poll.deadline.missed == 1
+    assert poll.breaker.consecutive_failures == 0
+    # The lost read is salvaged, the other groups are read as well
+    assert set(range(0, 6)) <= poll.updated_registers
+    assert set(range(38, 57)) <= poll.updated_registers
+
+
+class ProbeClient(FakeClient):
+    """Rejects empty writes like a heat pump with or without the functions."""
+
+    def __init__(self, supported: bool):
+        super().__init__()
+        self.code = 3 if supported else 1
+        self.writes = []
+
+    async def read_holding_registers(self, address, count=1, device_id=1):
+        return RtuResponse(HOLDING_REGISTER_CODE, [0] * count)
+
+    async def write_registers(self, address, values, device_id=1):
+        self.writes.append((address, list(values)))
+        return RtuResponse(0x10, exception_code=self.code)
+
+    async def readwrite_registers(self, *, write_address=0, values=(), **kwargs):
+        self.writes.append((write_address, list(values)))
+        return RtuResponse(0x17, exception_code=self.code)
+
+
+def test_probe_writes_nothing():
+    for supported in (True, False):
+        client = ProbeClient(supported)
+        poll = CopmaxModbusPoll("gateway", 502, client=client)
+        poll.frame_delay = 0
+
+        capabilities = asyncio.run(poll.probe_capabilities())
+
+        assert capabilities["write_multiple"] is supported
+        assert capabilities["read_write_multiple"] is supported
+        assert client.writes == [(24, []), (24, [])]
+
+
+def test_plan_uses_the_probed_reads():
+    poll = _poll()
+    assert list(poll._plan(HOLDING_REGISTER_CODE, 38, 19)) == [
+        (38, 7),
+        (45, 6),
+        (51, 6),
+    ]
+
+    poll.apply_capabilities({"max_read": {str(HOLDING_REGISTER_CODE): 19}})
+    assert list(poll._plan(HOLDING_REGISTER_CODE, 38, 19)) == [(38, 19)]
+
+    # The option caps the probed reads
+    poll.max_registers = 10
+    assert list(poll._plan(HOLDING_REGISTER_CODE, 38, 19)) == [(38, 10), (48, 9)]
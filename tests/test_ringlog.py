@@ -0,0 +1,59 @@
+"""Tests of the ring log wraparound."""
+
+from custom_components.copmax.ringlog import (
+    ADDRESSES,
+    MISSING,
+    CopmaxRingLog,
+    CopmaxRingLogReader,
+)
+
+
+def test_wraparound_keeps_the_newest_records(tmp_path):
+    path = str(tmp_path / "registers.ring")
+    log = CopmaxRingLog(path, 3)
+    for second in range(1, 6):
+        log.append(float(second), {0: -second, 6: 0xFFFF})
+
+    reader = CopmaxRingLogReader(path)
+    try:
+        assert reader.count == 5
+        assert len(reader) == 3
+        # The oldest record is in the middle of the file, read in two parts
+        assert len(reader.slice()) == 2
+
+        records = list(reader.records())
+        assert [timestamp for timestamp, _ in records] == [3.0, 4.0, 5.0]
+        _, values = records[-1]
+        assert values[ADDRESSES.index(0)] == -5
+        assert values[ADDRESSES.index(6)] == 0xFFFF
+        assert values[ADDRESSES.index(1)] == MISSING
+
+        assert [timestamp for timestamp, _ in reader.records(4.0)] == [4.0, 5.0]
+        assert [timestamp for timestamp, _ in reader.records(3.5, 5.0)] == [4.0]
+    finally:
+        reader.close()
+        log.close()
+
+
+def test_reopen_continues_the_ring(tmp_path):
+    path = str(tmp_path / "registers.ring")
+    log = CopmaxRingLog(path, 3)
+    for second in range(1, 5):
+        log.append(float(second), {})
+    log.close()
+
+    log = CopmaxRingLog(path, 3)
+    assert log.count == 4
+    log.append(5.0, {})
+    log.close()
+
+    reader = CopmaxRingLogReader(path)
+    try:
+        assert [timestamp for timestamp, _ in reader.records()] == [3.0, 4.0, 5.0]
+    finally:
+        reader.close()
+
+    # Another size starts over
+    log = CopmaxRingLog(path, 4)
+    assert log.count == 0
+    log.close()
@@ -0,0 +1,101 @@
+"""Tests of the RTU framing and CRC."""
+
+import asyncio
+
+import pytest
+
+from custom_components.copmax.rtu import CopmaxRtuClient, RtuFrameError, crc16, frame
+
+
+class FakeWriter:
+    def __init__(self):
+        self.sent = b""
+        self.closed = False
+
+    def write(self, data: bytes):
+        self.sent += data
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def _client(response: bytes, eof: bool = False):
+    """Client with a connection that answers with response."""
+    client = CopmaxRtuClient("gateway", 502, timeout=0.1)
+    client._reader = asyncio.StreamReader()
+    client._reader.feed_data(response)
+    if eof:
+        client._reader.feed_eof()
+    client._writer = FakeWriter()
+    return client
+
+
+@pytest.mark.parametrize(
+    ("pdu", "crc"),
+    [
+        ("010300000001", "840a"),
+        ("010400000001", "31ca"),
+        # Example of the Modbus over serial line specification
+        ("1103006b0003", "7687"),
+    ],
+)
+def test_crc16_known_frames(pdu, crc):
+    assert frame(bytes.fromhex(pdu)).hex() == pdu + crc
+    assert crc16(bytes.fromhex(pdu + crc)) == 0
+
+
+def test_read_holding_registers():
+    client = _client(frame(bytes.fromhex("010304002affff")))
+
+    response = asyncio.run(client.read_holding_registers(0, count=2))
+
+    assert client._writer.sent == bytes.fromhex("010300000002c40b")
+    assert not response.isError()
+    assert response.registers == [42, 0xFFFF]
+
+
+def test_exception_response():
+    client = _client(frame(bytes.fromhex("018302")))
+
+    response = asyncio.run(client.read_holding_registers(99))
+
+    assert response.isError()
+    assert response.exception_code == 2
+    assert client.connected
+
+
+def test_write_multiple_echo():
+    client = _client(frame(bytes.fromhex("011000180002")))
+
+    response = asyncio.run(client.write_registers(24, [1, 2]))
+
+    assert client._writer.sent == frame(bytes.fromhex("0110001800020400010002"))
+    assert response.registers == [1, 2]
+
+
+def test_crc_error_drops_connection():
+    response = bytearray(frame(bytes.fromhex("010302002a")))
+    response[-1] ^= 0xFF
+    client = _client(bytes(response))
+
+    with pytest.raises(RtuFrameError, match="CRC"):
+        asyncio.run(client.read_holding_registers(0))
+    assert not client.connected
+
+
+def test_truncated_frame_drops_connection():
+    client = _client(frame(bytes.fromhex("010302002a"))[:4], eof=True)
+
+    with pytest.raises(RtuFrameError, match="Truncated"):
+        asyncio.run(client.read_holding_registers(0))
+    assert not client.connected
+
+
+def test_response_of_other_device():
+    client = _client(frame(bytes.fromhex("020302002a")))
+
+    with pytest.raises(RtuFrameError, match="header"):
+        asyncio.run(client.read_holding_registers(0))
@@ -0,0 +1,31 @@
+"""Tests of the register diff of the setpoint schedule."""
+
+import time
+
+from custom_components.copmax.schedule import register_diff
+from custom_components.copmax.snapshot import CopmaxSnapshot
+
+
+def _snapshot(registers: dict, stale=()):
+    now = time.time()
+    timestamps = {
+        address: now - 3600 if address in stale else now for address in registers
+    }
+    return CopmaxSnapshot(
+        registers, timestamps, registers, (), {}, {address: 60 for address in registers}
+    )
+
+
+def test_only_changed_registers_are_written():
+    data = _snapshot({46: 3500, 36: 1, 40: 0xFFFB})
+
+    assert register_diff({46: 3500, 36: 2}, data) == {36: 2}
+    # Signed values compare by their 16 bit representation
+    assert register_diff({40: -5}, data) == {}
+
+
+def test_unknown_and_stale_registers_are_written():
+    data = _snapshot({46: 3500, 36: 1}, stale=(46,))
+
+    assert register_diff({46: 3500, 36: 1, 50: 7}, data) == {46: 3500, 50: 7}
+    assert register_diff({46: 3500}, None) == {46: 3500}
@@ -0,0 +1,26 @@
+"""Tests of the pymodbus clients of the transports."""
+
+import asyncio
+
+from custom_components.copmax.const import TRANSPORT_TCP
+from custom_components.copmax.transport import client_class
+
+
+def test_read_write_without_values_writes_no_register():
+    sent = []
+
+    async def execute(no_response_expected, request):
+        sent.append(request)
+
+    async def probe():
+        client = client_class(TRANSPORT_TCP)("gateway", port=502)
+        client.execute = execute
+        await client.readwrite_registers(
+            read_address=24, read_count=1, write_address=24, values=[]
+        )
+
+    asyncio.run(probe())
+
+    # Read 1 register at 24, write 0 registers (0 bytes) at 24
+    assert sent[0].function_code == 0x17
+    assert sent[0].encode() == bytes.fromhex("0018000100180000" "00")